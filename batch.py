@@ -0,0 +1,139 @@
+import asyncio
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+
+def domain_key(url):
+    """Host used to group URLs for per-domain concurrency limits"""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class _Scheduler:
+    """Decides which URLs start next, at most max_workers at once and per_domain per host
+
+    Input is read lazily, only while a worker is idle. URLs whose host is at its limit
+    wait in per-host queues and reading continues past them, so one busy host at the
+    head of input grouped by domain doesn't leave the other workers idle; at most
+    window URLs ever wait, which bounds how far past a busy host it looks.
+    """
+
+    def __init__(self, urls, max_workers, per_domain, window):
+        self.urls = enumerate(urls)
+        self.exhausted = False
+        self.max_workers = max_workers
+        self.per_domain = per_domain
+        self.window = window or max(max_workers * 128, 1024)
+        self.waiting = {}  # domain -> deque of (index, url) not yet started
+        self.waiting_count = 0
+        self.active = defaultdict(int)
+        self.running = 0
+
+    def _can_start(self, domain):
+        return self.running < self.max_workers and self.active[domain] < self.per_domain
+
+    def _start(self, domain):
+        self.running += 1
+        self.active[domain] += 1
+
+    def next_batch(self):
+        """(index, url, domain) for every URL that may start now"""
+        started = []
+        for domain in list(self.waiting):
+            pending = self.waiting[domain]
+            while pending and self._can_start(domain):
+                index, url = pending.popleft()
+                self.waiting_count -= 1
+                self._start(domain)
+                started.append((index, url, domain))
+            if not pending:
+                del self.waiting[domain]
+
+        while not self.exhausted and self.running < self.max_workers and self.waiting_count < self.window:
+            try:
+                index, url = next(self.urls)
+            except StopIteration:
+                self.exhausted = True
+                break
+            domain = domain_key(url)
+            # URLs already queued for this host go first
+            if domain not in self.waiting and self._can_start(domain):
+                self._start(domain)
+                started.append((index, url, domain))
+            else:
+                self.waiting.setdefault(domain, deque()).append((index, url))
+                self.waiting_count += 1
+        return started
+
+    def finished(self, domain):
+        self.running -= 1
+        self.active[domain] -= 1
+
+
+def iter_batch(extract, urls, max_workers=8, per_domain=2, ordered=True, window=None):
+    """Run extract(url) concurrently and yield results in input or completion order
+
+    With ordered=True no new URLs start while window results wait behind a slow one.
+    """
+    scheduler = _Scheduler(urls, max_workers, per_domain, window)
+    running = {}  # future -> (index, domain)
+    finished = {}
+    next_index = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            if not ordered or len(finished) < scheduler.window or not running:
+                for index, url, domain in scheduler.next_batch():
+                    running[pool.submit(extract, url)] = (index, domain)
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, domain = running.pop(future)
+                scheduler.finished(domain)
+                if ordered:
+                    finished[index] = future.result()
+                else:
+                    yield future.result()
+
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+
+
+async def iter_batch_async(extract, urls, max_workers=8, per_domain=2, ordered=True, window=None):
+    """Asyncio variant of iter_batch; blocking extract calls run on a thread pool"""
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    scheduler = _Scheduler(urls, max_workers, per_domain, window)
+    tasks = {}  # future -> (index, domain)
+    finished = {}
+    next_index = 0
+    try:
+        while True:
+            if not ordered or len(finished) < scheduler.window or not tasks:
+                for index, url, domain in scheduler.next_batch():
+                    tasks[loop.run_in_executor(executor, extract, url)] = (index, domain)
+
+            if not tasks:
+                break
+
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, domain = tasks.pop(task)
+                scheduler.finished(domain)
+                if ordered:
+                    finished[index] = task.result()
+                else:
+                    yield task.result()
+
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False)
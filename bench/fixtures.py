@@ -0,0 +1,121 @@
+"""Deterministic synthetic product pages for the benchmark corpus
+
+Each page mimics a common storefront shape (server-rendered with JSON-LD,
+microdata with a mega menu, a large React SSR page, an SPA shell, and a page
+with no markup at all) at a different size. Pages are regenerated from a fixed
+seed, so every run and every machine benchmarks the same bytes.
+"""
+import json
+import os
+import random
+
+WORDS = ('premium durable lightweight wireless compact stainless ergonomic portable adjustable '
+         'waterproof rechargeable smart classic modern cotton leather ceramic digital').split()
+
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _mega_menu(rng, links):
+    items = ''.join(f'<li><a href="/c/{i}">{rng.choice(WORDS).title()} {i}</a></li>' for i in range(links))
+    return f'<nav class="mega-menu"><ul>{items}</ul></nav>'
+
+
+def _cookie_banner():
+    return ('<div class="cookie-banner">We use cookies to improve your experience. Accept all cookies. '
+            'Privacy policy. Manage preferences. Sign in for the best experience.</div>')
+
+
+def _specs_table(rng, rows):
+    cells = ''.join(f'<tr><th>{rng.choice(WORDS).title()} {i}</th><td>{rng.randint(1, 999)} mm</td></tr>'
+                    for i in range(rows))
+    return f'<table class="specs"><caption>Specifications</caption>{cells}</table>'
+
+
+def _reviews(rng, count):
+    return ''.join(f'<div class="review"><span class="stars">{rng.randint(1, 5)} stars</span>'
+                   f'<p>{_sentence(rng, 25)}</p></div>' for _ in range(count))
+
+
+def small_jsonld(rng):
+    product = {
+        "@context": "https://schema.org", "@type": "Product", "name": "Acme Trail Runner 2",
+        "description": "Lightweight trail running shoe with a grippy outsole.", "brand": {"@type": "Brand", "name": "Acme"},
+        "image": "https://cdn.example.com/acme-trail-runner-2.jpg",
+        "offers": {"@type": "Offer", "price": "89.99", "priceCurrency": "USD",
+                   "availability": "https://schema.org/InStock"},
+        "aggregateRating": {"@type": "AggregateRating", "ratingValue": "4.6", "reviewCount": "1287"},
+    }
+    body = ''.join(f'<p>{_sentence(rng)}</p>' for _ in range(60))
+    return (f'<html><head><title>Acme Trail Runner 2</title>'
+            f'<script type="application/ld+json">{json.dumps(product)}</script></head>'
+            f'<body><header>Shop</header><main><h1>Acme Trail Runner 2</h1><span class="price">$89.99</span>'
+            f'<button>Add to cart</button>{body}{_reviews(rng, 20)}</main><footer>Footer</footer></body></html>')
+
+
+def medium_microdata(rng):
+    return (f'<html><head><title>Nimbus Blender</title></head><body>{_cookie_banner()}{_mega_menu(rng, 3000)}'
+            f'<div itemscope itemtype="https://schema.org/Product"><h1 itemprop="name">Nimbus Pro Blender 900</h1>'
+            f'<img itemprop="image" src="https://cdn.example.com/nimbus-900.jpg">'
+            f'<span itemprop="brand">Nimbus</span><p itemprop="description">{_sentence(rng, 30)}</p>'
+            f'<div itemprop="offers" itemscope><meta itemprop="priceCurrency" content="EUR">'
+            f'<span itemprop="price" content="129.00">€129.00</span>'
+            f'<link itemprop="availability" href="https://schema.org/InStock">In stock</div>'
+            f'<button>Add to basket</button>{_specs_table(rng, 80)}{_reviews(rng, 200)}</div>'
+            f'<footer>{_sentence(rng, 40)}</footer></body></html>')
+
+
+def large_react_ssr(rng):
+    state = {"props": {"pageProps": {"catalog": [
+        {"id": i, "name": _sentence(rng, 5), "price": rng.randint(5, 500)} for i in range(12000)]}}}
+    css = ''.join(f'.c{i}{{margin:{i % 7}px;color:#{i % 4096:03x}}}' for i in range(8000))
+    sections = ''.join(f'<section class="s{i}"><h2>{_sentence(rng, 4)}</h2><p>{_sentence(rng, 40)}</p></section>'
+                       for i in range(600))
+    return (f'<html><head><title>Orbit 55" 4K TV</title>'
+            f'<meta property="og:title" content="Orbit 55&quot; 4K Smart TV">'
+            f'<meta property="og:image" content="https://cdn.example.com/orbit-55.jpg">'
+            f'<meta property="product:price:amount" content="499.00">'
+            f'<meta property="product:price:currency" content="GBP"><style>{css}</style></head>'
+            f'<body><div id="__next">{_cookie_banner()}{_mega_menu(rng, 1500)}'
+            f'<h1>Orbit 55" 4K Smart TV</h1><div class="price">£499.00</div><div>4.3 out of 5 stars 2,311 reviews</div>'
+            f'<button>Add to basket</button>{_specs_table(rng, 120)}{sections}</div>'
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(state)}</script></body></html>')
+
+
+def spa_shell(rng):
+    bundle = 'var x=' + json.dumps([_sentence(rng, 8) for _ in range(200)]) + ';'
+    return (f'<html><head><title>Loading...</title></head><body>'
+            f'<noscript>You need to enable JavaScript to run this app.</noscript>'
+            f'<div id="root"></div><script>{bundle}</script></body></html>')
+
+
+def plain_no_markup(rng):
+    body = ''.join(f'<p>{_sentence(rng, 20)}</p>' for _ in range(300))
+    return (f'<html><head><title>Kettle</title></head><body>{_cookie_banner()}{_mega_menu(rng, 400)}'
+            f'<h1>Brewmaster Glass Kettle 1.7L</h1><p>Price: ₹2,499</p><p>In stock. Sold by Brewmaster Store</p>'
+            f'<p>4.1 out of 5 stars 845 ratings</p><ul><li>• Borosilicate glass body with blue LED</li>'
+            f'<li>• Auto shut-off and boil-dry protection</li></ul>{body}</body></html>')
+
+
+FIXTURES = {
+    'small_jsonld.html': small_jsonld,
+    'medium_microdata.html': medium_microdata,
+    'large_react_ssr.html': large_react_ssr,
+    'spa_shell.html': spa_shell,
+    'plain_no_markup.html': plain_no_markup,
+}
+
+
+def build_fixtures(directory, seed=1234):
+    """Write every fixture into directory (if missing) and return {name: path}"""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for index, (name, builder) in enumerate(FIXTURES.items()):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            html = builder(random.Random(seed + index))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(html)
+        paths[name] = path
+    return paths
@@ -0,0 +1,211 @@
+"""Reproducible benchmark for the extraction pipeline
+
+Serves the synthetic fixture corpus from a local HTTP server (with optional
+latency), points the extractor at the mock LLM server, and times each stage:
+fetch, render, parse/clean, structured data, regex fallback, LLM and JSON
+repair, plus end-to-end extract_product_data. Reports throughput, p50/p95/p99
+latency and peak RSS. Results are compared with a stored baseline so
+performance regressions are caught. Timings depend on the machine, so no
+baseline is committed: record one on the machine (or CI runner) that runs
+the comparison.
+
+    python bench/run_bench.py                    # run and compare with bench/baseline.json
+    python bench/run_bench.py --save-baseline    # record a new baseline
+    python bench/run_bench.py --require-baseline # fail instead of passing when there is none
+    python bench/run_bench.py --render           # include Selenium (needs Chrome)
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fixtures import build_fixtures  # noqa: E402
+from mock_llm_server import start_mock_server  # noqa: E402
+from product_extractor import UniversalProductExtractor, build_product_prompt  # noqa: E402
+from content_windowing import select_product_content  # noqa: E402
+from structured_data import extract_structured_data  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+STAGES = ('fetch', 'render', 'parse_clean', 'structured_data', 'regex_fallback', 'llm', 'json_repair', 'end_to_end')
+
+
+def start_fixture_server(directory, latency=0.0):
+    """Serve fixture files over HTTP, sleeping `latency` seconds before each response"""
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            super().do_GET()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fixture-server', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+class StageTimer:
+    """Collects wall-clock samples per stage"""
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+
+    def time(self, stage, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        self.samples[stage].append(time.perf_counter() - started)
+        return result
+
+    def summary(self):
+        report = {}
+        for stage, samples in self.samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            total = sum(ordered)
+            report[stage] = {
+                "n": len(ordered),
+                "ops_per_second": round(len(ordered) / total, 2) if total else None,
+                "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+            }
+        return report
+
+
+def run(iterations=5, latency=0.0, llm_latency=0.05, render=False):
+    """Run every stage over the corpus and return the report dict"""
+    paths = build_fixtures(os.path.join(BENCH_DIR, 'fixtures'))
+    page_server, page_base = start_fixture_server(os.path.join(BENCH_DIR, 'fixtures'), latency)
+    llm_server, llm_url = start_mock_server(latency=llm_latency, per_prompt_latency=0.0, jitter=0.0)
+
+    extractor = UniversalProductExtractor(llm_api_url=llm_url, llm_requests_per_second=1000.0)
+    extractor.request_delay = 0
+    if not render:
+        extractor.fetch_strategy.approaches = ['static']
+
+    timer = StageTimer()
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        for _ in range(iterations):
+            for name in paths:
+                url = f"{page_base}/{name}"
+                html = timer.time('fetch', extractor._fetch_static_html, url)
+                if render:
+                    timer.time('render', extractor._fetch_rendered_html, url)
+                text = timer.time('parse_clean', extractor._clean_html, html, extractor.text_limits['static'])
+                timer.time('structured_data', extract_structured_data, html)
+                timer.time('regex_fallback', extractor._regex_fallback_extraction, text, url)
+                prompt = build_product_prompt(select_product_content(text, html, extractor.llm_token_budget))
+                response = timer.time('llm', extractor.query_llm, prompt)
+                if response:
+                    timer.time('json_repair', extractor._parse_llm_json, response)
+                timer.time('end_to_end', extractor.extract_product_data, url)
+                # Templates learned on one iteration would turn later LLM stages into no-ops
+                extractor.selector_learner.forget(url)
+
+    extractor.close()
+    page_server.shutdown()
+    llm_server.shutdown()
+    return {
+        "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "iterations": iterations,
+        "fixtures": {name: os.path.getsize(path) for name, path in paths.items()},
+        "stages": timer.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(report, baseline, tolerance=0.2, noise_floor_ms=1.0):
+    """List of regressions where p50/p95 grew by more than tolerance (and the noise floor)"""
+    regressions = []
+    for stage, current in report["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            before, after = previous[metric], current[metric]
+            if after > before * (1 + tolerance) and after - before > noise_floor_ms:
+                regressions.append(f"{stage} {metric}: {before:.2f} -> {after:.2f} ms")
+    previous_rss = baseline.get("peak_rss_mb")
+    if previous_rss and report["peak_rss_mb"] > previous_rss * (1 + tolerance):
+        regressions.append(f"peak RSS: {previous_rss} -> {report['peak_rss_mb']} MB")
+    return regressions
+
+
+def print_report(report):
+    print(f"{'stage':<18}{'n':>6}{'ops/s':>12}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+    for stage, row in report["stages"].items():
+        print(f"{stage:<18}{row['n']:>6}{row['ops_per_second']:>12}{row['p50_ms']:>12}"
+              f"{row['p95_ms']:>12}{row['p99_ms']:>12}")
+    print(f"peak RSS: {report['peak_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the product extraction pipeline")
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0, help="fixture server latency in seconds")
+    parser.add_argument('--llm-latency', type=float, default=0.05, help="mock LLM latency in seconds")
+    parser.add_argument('--render', action='store_true', help="include the Selenium render stage")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--require-baseline', action='store_true', help="exit non-zero if there is no baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before failing")
+    parser.add_argument('--output', help="also write the report JSON here")
+    args = parser.parse_args()
+
+    report = run(args.iterations, args.latency, args.llm_latency, args.render)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save-baseline to record one")
+        return 2 if args.require_baseline else 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        regressions = compare(report, json.load(f), args.tolerance)
+    if regressions:
+        print("Performance regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
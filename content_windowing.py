@@ -0,0 +1,113 @@
+import html as html_lib
+import re
+from extraction_rules import PRICE_PATTERN
+
+CHARS_PER_TOKEN = 4
+
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+')
+H1_PATTERN = re.compile(r'<h1\b[^>]*>(.*?)</h1>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+CART_SIGNAL = re.compile(
+    r'add to (?:cart|bag|basket|trolley)|buy (?:it )?now|in stock|out of stock|sold out|pre-?order|delivery by',
+    re.IGNORECASE,
+)
+RATING_SIGNAL = re.compile(r'\d(?:\.\d)?\s*(?:out of 5|/\s*5|stars?)|\d[\d,]*\s*(?:reviews|ratings)', re.IGNORECASE)
+SPEC_PAIR_SIGNAL = re.compile(r'\b[A-Z][A-Za-z ]{1,25}:\s*\S')
+SPEC_WORD_SIGNAL = re.compile(
+    r'\b(?:specifications?|dimensions|weight|material|model|warranty|capacity|size|colou?r)\b', re.IGNORECASE
+)
+DESCRIPTION_SIGNAL = re.compile(r'\b(?:description|about this item|product details|features|highlights)\b',
+                                re.IGNORECASE)
+NOISE_SIGNAL = re.compile(
+    r'cookie|privacy policy|sign in|log in|newsletter|subscribe|terms of use|all rights reserved|'
+    r'gift cards?|customer service|track order|download (?:the )?app',
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text):
+    """Rough token count used for prompt budgeting"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def page_title(html):
+    """Text of the page's first <h1>, if any"""
+    if not html:
+        return None
+    match = H1_PATTERN.search(html)
+    if not match:
+        return None
+    title = re.sub(r'\s+', ' ', html_lib.unescape(TAG_PATTERN.sub(' ', match.group(1)))).strip()
+    return title or None
+
+
+def split_windows(text, chunk_chars=400):
+    """Split cleaned text into windows of about chunk_chars, preferring sentence boundaries"""
+    windows = []
+    current = ''
+    for sentence in SENTENCE_BOUNDARY_PATTERN.split(text):
+        # Menus and spec dumps often have no punctuation; cut them at word boundaries
+        while len(sentence) > chunk_chars:
+            cut = sentence.rfind(' ', 0, chunk_chars)
+            cut = cut if cut > 0 else chunk_chars
+            if current:
+                windows.append(current)
+                current = ''
+            windows.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + len(sentence) + 1 > chunk_chars:
+            windows.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        windows.append(current)
+    return [window for window in windows if window]
+
+
+def score_window(window, title=None):
+    """Product-relevance score of a text window"""
+    score = 0.0
+    score += 3.0 * min(len(PRICE_PATTERN.findall(window)), 2)
+    score += 3.0 * min(len(CART_SIGNAL.findall(window)), 1)
+    score += 2.0 * min(len(RATING_SIGNAL.findall(window)), 1)
+    score += 0.5 * min(len(SPEC_PAIR_SIGNAL.findall(window)), 6)
+    score += 1.0 * min(len(SPEC_WORD_SIGNAL.findall(window)), 2)
+    score += 1.5 * min(len(DESCRIPTION_SIGNAL.findall(window)), 1)
+    score -= 2.0 * min(len(NOISE_SIGNAL.findall(window)), 2)
+    if title and title.lower() in window.lower():
+        score += 5.0
+    return score
+
+
+def select_product_content(text, html=None, token_budget=1000, chunk_chars=400):
+    """Pack the most product-relevant windows of text into token_budget, in page order"""
+    if estimate_tokens(text) <= token_budget:
+        return text
+    title = page_title(html)
+    windows = split_windows(text, chunk_chars)
+    scores = [score_window(window, title) for window in windows]
+    # Purchase controls sit next to price/variant details; lift the neighbours too
+    for index, window in enumerate(windows):
+        if CART_SIGNAL.search(window):
+            for neighbour in (index - 1, index + 1):
+                if 0 <= neighbour < len(windows):
+                    scores[neighbour] += 1.5
+
+    budget = token_budget * CHARS_PER_TOKEN
+    header = ''
+    if title and not any(title.lower() in window.lower() for window in windows):
+        header = f"{title}. "
+        budget -= len(header)
+
+    chosen = []
+    used = 0
+    # Highest score first; earlier windows win ties
+    for index in sorted(range(len(windows)), key=lambda i: (-scores[i], i)):
+        cost = len(windows[index]) + 1
+        if scores[index] < 0 or used + cost > budget:
+            continue
+        chosen.append(index)
+        used += cost
+    return header + ' '.join(windows[index] for index in sorted(chosen))
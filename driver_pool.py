@@ -0,0 +1,235 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# selenium and webdriver_manager are imported where first needed: they take a large share of
+# startup time, and static-only runs never start a browser
+
+logger = logging.getLogger(__name__)
+
+# Requests that never matter for product text: images, media, fonts, ads and analytics
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico', '*.bmp',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3', '*.ogg', '*.wav',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*google-analytics.com*', '*googletagmanager.com*', '*googlesyndication.com*', '*doubleclick.net*',
+    '*adservice.google.*', '*connect.facebook.net*', '*hotjar.com*', '*segment.io*', '*segment.com*',
+    '*scorecardresearch.com*', '*criteo.com*', '*criteo.net*', '*taboola.com*', '*outbrain.com*',
+    '*amazon-adsystem.com*', '*newrelic.com*', '*nr-data.net*', '*clarity.ms*', '*mixpanel.com*',
+]
+
+# Polled by wait_until_ready: a learned selector or a price means the product is in the DOM;
+# otherwise the page is ready once no new resources have started for idle_ms
+READY_SCRIPT = r"""
+var selector = arguments[0], idleMs = arguments[1];
+if (selector) {
+    try { if (document.querySelector(selector)) return 'selector'; } catch (e) {}
+}
+var body = document.body;
+if (body && /(?:[\u20b9$\u20ac\u00a3\u00a5]\s?\d|\b(?:USD|EUR|GBP|INR|Rs\.?)\s?\d)/.test(body.textContent.slice(0, 200000))) {
+    return 'price';
+}
+var count = performance.getEntriesByType('resource').length, now = performance.now();
+if (window.__readyCount !== count) {
+    window.__readyCount = count;
+    window.__readySince = now;
+    return null;
+}
+return document.readyState !== 'loading' && now - window.__readySince >= idleMs ? 'network_idle' : null;
+"""
+
+# Per-site state wiped between leases with CDP Storage.clearDataForOrigin. The HTTP cache is
+# deliberately kept: a site's script and CSS bundles are shared by all its product pages
+SITE_DATA_TYPES = 'cookies,local_storage,indexeddb,websql,service_workers,cache_storage,file_systems'
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path():
+    """Resolve the ChromeDriver binary once per process"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+def wait_until_ready(driver, selector=None, timeout=5.0, idle_ms=500, poll=0.1):
+    """Wait until product content is present or the network goes quiet, at most timeout seconds
+
+    Returns why the wait ended: 'selector', 'price', 'network_idle' or 'timeout'.
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll).until(
+            lambda d: d.execute_script(READY_SCRIPT, selector, idle_ms)
+        )
+    except TimeoutException:
+        return 'timeout'
+
+
+class ChromeDriverPool:
+    """Bounded pool of long-lived headless Chrome drivers"""
+
+    def __init__(self, size=2, max_uses=100, max_heap_mb=512, page_load_timeout=30, lease_timeout=120,
+                 page_load_strategy='eager', block_resources=True):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
+        self.page_load_timeout = page_load_timeout
+        self.lease_timeout = lease_timeout
+        # 'eager' returns from get() at DOMContentLoaded instead of waiting for every subresource
+        self.page_load_strategy = page_load_strategy
+        self.block_resources = block_resources
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._drivers = {}  # driver -> number of completed leases
+        self._closed = False
+
+    def _build_options(self):
+        """Chrome options shared by every pooled driver"""
+        from selenium.webdriver.chrome.options import Options
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--window-size=1280,800')
+        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        chrome_options.page_load_strategy = self.page_load_strategy
+        if self.block_resources:
+            # Belt and braces for the CDP block list: never decode images at all
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+            chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        return chrome_options
+
+    def _create_driver(self):
+        """Start a new Chrome process and register it with the pool"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        service = Service(resolve_driver_path())
+        driver = webdriver.Chrome(service=service, options=self._build_options())
+        driver.set_page_load_timeout(self.page_load_timeout)
+        if self.block_resources:
+            try:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+            except Exception as e:
+                logger.debug("Could not install the CDP URL block list: %s", e)
+        with self._lock:
+            self._drivers[driver] = 0
+        return driver
+
+    def _discard(self, driver):
+        """Quit a driver and forget about it"""
+        with self._lock:
+            self._drivers.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _is_healthy(self, driver):
+        """Check that the browser still responds and has not bloated"""
+        try:
+            heap = driver.execute_script(
+                'return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0'
+            ) or 0
+        except Exception:
+            return False
+        return heap < self.max_heap_mb * 1024 * 1024
+
+    def _reset(self, driver):
+        """Clear cookies, the visited sites' storage and extra tabs left over from the last lease"""
+        handles = driver.window_handles
+        origins = set()
+        for handle in reversed(handles):
+            driver.switch_to.window(handle)
+            parsed = urlparse(driver.current_url)
+            if parsed.scheme in ('http', 'https'):
+                origins.add(f"{parsed.scheme}://{parsed.netloc}")
+            if handle != handles[0]:
+                driver.close()
+        driver.switch_to.window(handles[0])
+        try:
+            driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
+        except Exception:
+            pass
+        driver.delete_all_cookies()
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            for origin in origins:
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin',
+                                       {'origin': origin, 'storageTypes': SITE_DATA_TYPES})
+        except Exception:
+            pass
+        driver.get('about:blank')
+
+    def _checkout(self):
+        """Take an idle healthy driver or start a fresh one"""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return self._create_driver()
+            if self._is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def _checkin(self, driver):
+        """Return a driver to the pool, recycling it when worn out"""
+        with self._lock:
+            if driver not in self._drivers:
+                return
+            self._drivers[driver] += 1
+            worn_out = self._drivers[driver] >= self.max_uses
+        if self._closed or worn_out or not self._is_healthy(driver):
+            logger.debug("Recycling Chrome driver (closed=%s, worn_out=%s)", self._closed, worn_out)
+            self._discard(driver)
+            return
+        try:
+            self._reset(driver)
+        except Exception as e:
+            logger.debug("Chrome driver reset failed, recycling it: %s", e)
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self):
+        """Borrow a driver for the duration of a with-block"""
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+        if not self._slots.acquire(timeout=self.lease_timeout):
+            raise TimeoutError("Timed out waiting for a free Chrome driver")
+        driver = None
+        try:
+            driver = self._checkout()
+            yield driver
+        finally:
+            if driver is not None:
+                self._checkin(driver)
+            self._slots.release()
+
+    def stats(self):
+        """Return a snapshot of pool usage"""
+        with self._lock:
+            live = len(self._drivers)
+        return {"size": self.size, "live": live, "idle": self._idle.qsize()}
+
+    def close(self):
+        """Quit idle drivers; leased ones are quit when they are returned"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
@@ -0,0 +1,247 @@
+import json
+import re
+import threading
+
+try:
+    import ahocorasick
+except ImportError:  # optional C implementation of the keyword automaton
+    ahocorasick = None
+
+# The one definition of a price in text (symbol or code, then an amount): the regex fallback,
+# re-crawl masking, the JS-shell check, content windowing and template validation all use it
+PRICE_PATTERN = re.compile(r'(?:[₹$€£¥]|\b(?:USD|EUR|GBP|INR|Rs\.?))\s*\d[\d,]*(?:\.\d+)?', re.IGNORECASE)
+RATING_PATTERN = re.compile(r'(\d+\.\d+)\s*(?:out of|stars?|rating)', re.IGNORECASE)
+REVIEWS_PATTERN = re.compile(r'(\d[\d,]*)\s*(reviews|ratings|customers)', re.IGNORECASE)
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]')
+SPEC_PATTERNS = [
+    re.compile(r'([A-Za-z\s]+):\s*([^\n\.]+)'),
+    re.compile(r'([A-Za-z\s]+)\s*[-–]\s*([^\n\.]+)'),
+]
+BULLET_PATTERNS = [
+    re.compile(r'•\s*(.+?)(?=\.|$)'),
+    re.compile(r'-\s*(.+?)(?=\.|$)'),
+    re.compile(r'\d+\.\s*(.+?)(?=\.|$)'),
+]
+BRAND_LABEL_PATTERN = re.compile(r'Brand\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)', re.IGNORECASE)
+NUMERIC_PATTERN = re.compile(r'^\d+$')
+EDGE_NON_WORD_PATTERN = re.compile(r'^\W+|\W+$')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Rule tables for the regex fallback. A JSON file with the same keys can extend them
+# (lists are appended, category/availability keyword lists are merged) without code changes.
+DEFAULT_RULES = {
+    "brands": ['samsung', 'apple', 'nike', 'adidas', 'sony', 'lg', 'xiaomi',
+               'oneplus', 'dell', 'hp', 'lenovo', 'asus', 'canon', 'nikon', 'mi', 'croma'],
+    "categories": {
+        'electronics': ['phone', 'tv', 'laptop', 'camera', 'headphone', 'electronic', 'smartphone', 'tablet'],
+        'fashion': ['shirt', 'dress', 'shoe', 'jeans', 'fashion', 'clothing', 'apparel', 'wear'],
+        'home': ['furniture', 'kitchen', 'home', 'decor', 'appliance', 'garden', 'living'],
+        'books': ['book', 'novel', 'author', 'publisher', 'literature'],
+        'sports': ['sport', 'fitness', 'gym', 'outdoor', 'exercise', 'training'],
+    },
+    # Checked in this order: the first status with any matching phrase wins
+    "availability": {
+        'Out of Stock': ['out of stock', 'sold out', 'unavailable'],
+        'Pre-order': ['pre-order', 'preorder', 'coming soon'],
+        'In Stock': ['in stock', 'available', 'add to cart', 'buy now'],
+    },
+    "seller_patterns": [
+        # General patterns that work across multiple sites
+        r'Sold\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)(?:\s*\(.*\))?',
+        r'Seller\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)(?:\s*\(.*\))?',
+        r'Fulfilled\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+        r'Provided\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+        r'Distributed\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+        r'Vendor\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+        r'Retailer\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+
+        # Site-specific patterns
+        # Amazon
+        r'Ships from[s\s]*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+        r'by\s*([A-Za-z0-9 &.,\-]+)(?:\s*\|.*)?$',
+
+        # eBay
+        r'Sold\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)\s*\(\d+\)',
+        r'from\s*([A-Za-z0-9 &.,\-]+)\s*\(\d+\)',
+
+        # Walmart
+        r'Sold\s+& shipped by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+
+        # Best Buy
+        r'Sold\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)\s*online',
+    ],
+    # Lines mentioning one of these are searched for a name after any of the seller_phrases
+    "seller_line_triggers": ['sold by', 'seller:', 'fulfilled by', 'provided by'],
+    "seller_phrases": ['sold by', 'seller', 'fulfilled by', 'provided by'],
+    "seller_false_positives": [
+        'return', 'policy', 'warranty', 'description', 'cart', 'electronics',
+        'tvs', 'appliances', 'men', 'women', 'baby', 'kids', 'home', 'furniture',
+        'sports', 'books', 'more', 'flights', 'offer', 'zone', 'add', 'buy', 'now',
+        'early', 'bird', 'deals', 'starts', 'in', 'hrs', 'days', 'brand', 'audio',
+        'video', 'support', 'service', 'help', 'contact', 'about', 'information',
+    ],
+}
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every (overlapping) keyword occurrence in one pass
+
+    Uses pyahocorasick when installed and a pure-Python automaton otherwise.
+    Scan cost depends on the text length, not on the number of keywords.
+    """
+
+    def __init__(self, keywords):
+        payloads = {}
+        for keyword, payload in keywords:
+            if keyword:
+                payloads.setdefault(keyword.lower(), []).append(payload)
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, values in payloads.items():
+                self._automaton.add_word(keyword, values)
+            if payloads:
+                self._automaton.make_automaton()
+            else:
+                self._automaton = None
+        else:
+            self._automaton = None
+            self._build(payloads)
+
+    def _build(self, payloads):
+        goto = [{}]
+        output = [[]]
+        for keyword, values in payloads.items():
+            state = 0
+            for ch in keyword:
+                if ch not in goto[state]:
+                    goto.append({})
+                    output.append([])
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            output[state].extend(values)
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(ch, 0)
+                output[child] = output[child] + output[fail[child]]
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def iter(self, text):
+        """Yield (end_index, payload) for each keyword occurrence in text (already lower-cased)"""
+        if ahocorasick is not None:
+            if self._automaton is None:
+                return
+            for end, values in self._automaton.iter(text):
+                for value in values:
+                    yield end, value
+            return
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                for value in output[state]:
+                    yield index, value
+
+
+def merge_rules(base, extra):
+    """Extend a rule table with entries from another (e.g. loaded from JSON)"""
+    merged = json.loads(json.dumps(base))
+    for key, value in extra.items():
+        if isinstance(value, dict):
+            section = merged.setdefault(key, {})
+            for name, items in value.items():
+                section.setdefault(name, [])
+                section[name].extend(item for item in items if item not in section[name])
+        elif isinstance(value, list):
+            section = merged.setdefault(key, [])
+            section.extend(item for item in value if item not in section)
+        else:
+            merged[key] = value
+    return merged
+
+
+class RuleSet:
+    """Rule tables compiled once into shared matchers for the regex fallback"""
+
+    def __init__(self, rules=None):
+        self.rules = rules or DEFAULT_RULES
+        keywords = []
+        for priority, brand in enumerate(self.rules.get('brands', [])):
+            keywords.append((brand, ('brand', brand.capitalize(), priority)))
+        for priority, (category, words) in enumerate(self.rules.get('categories', {}).items()):
+            keywords.extend((word, ('category', category.capitalize(), priority)) for word in words)
+        for priority, (status, phrases) in enumerate(self.rules.get('availability', {}).items()):
+            keywords.extend((phrase, ('availability', status, priority)) for phrase in phrases)
+        self.keywords = KeywordAutomaton(keywords)
+        phrases = sorted({phrase for items in self.rules.get('availability', {}).values() for phrase in items},
+                         key=len, reverse=True)
+        self.availability_pattern = (
+            re.compile('|'.join(re.escape(phrase) for phrase in phrases), re.IGNORECASE) if phrases else None
+        )
+
+        self.seller_patterns = [re.compile(p, re.IGNORECASE) for p in self.rules.get('seller_patterns', [])]
+        self.seller_line_triggers = tuple(t.lower() for t in self.rules.get('seller_line_triggers', []))
+        # (lowercase phrase, pattern) pairs; the substring check skips the regex on most lines
+        self.seller_phrases = [
+            (phrase.lower(),
+             re.compile(r'{}\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)'.format(re.escape(phrase)), re.IGNORECASE))
+            for phrase in self.rules.get('seller_phrases', [])
+        ]
+        false_positives = sorted(self.rules.get('seller_false_positives', []), key=len, reverse=True)
+        self.seller_false_positive = (
+            re.compile('|'.join(re.escape(fp) for fp in false_positives)) if false_positives else None
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        """Compile the default rules extended by a JSON rules file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(merge_rules(DEFAULT_RULES, json.load(f)))
+
+    def scan(self, text, url=''):
+        """Single pass over the page filling brand, category and availability
+
+        Brand and category look at the text plus the URL; availability at the text only.
+        The earliest-listed brand/category/status that occurs anywhere wins.
+        """
+        text_lower = text.lower()
+        combined = text_lower + ' ' + url.lower()
+        text_end = len(text_lower)
+        best = {}
+        for end, (field, value, priority) in self.keywords.iter(combined):
+            if field == 'availability' and end >= text_end:
+                continue
+            if field not in best or priority < best[field][0]:
+                best[field] = (priority, value)
+        return {field: value for field, (priority, value) in best.items()}
+
+    def mask_volatile(self, text):
+        """Text with prices and availability phrases blanked out, so price/stock-only changes compare equal"""
+        text = PRICE_PATTERN.sub('<price>', text)
+        return self.availability_pattern.sub('<availability>', text) if self.availability_pattern else text
+
+    def is_false_positive(self, seller):
+        return bool(self.seller_false_positive and self.seller_false_positive.search(seller.lower()))
+
+
+_shared_rule_sets = {}
+_shared_lock = threading.Lock()
+
+
+def get_rule_set(path=None):
+    """Compiled RuleSet shared by every extractor using the same rules file"""
+    with _shared_lock:
+        if path not in _shared_rule_sets:
+            _shared_rule_sets[path] = RuleSet.from_file(path) if path else RuleSet()
+        return _shared_rule_sets[path]
@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+import re
+import threading
+from batch import domain_key
+from extraction_rules import PRICE_PATTERN
+
+logger = logging.getLogger(__name__)
+
+MARKUP_PRICE_PATTERN = re.compile(r'itemprop=["\']price["\']|"price"\s*:|property=["\']product:price', re.IGNORECASE)
+EMPTY_SPA_ROOT_PATTERN = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|main-app)["\'][^>]*>\s*</div>', re.IGNORECASE
+)
+NOSCRIPT_HINT_PATTERN = re.compile(r'<noscript[^>]*>[^<]*(?:enable|turn on)\s+javascript', re.IGNORECASE)
+
+
+def looks_like_js_shell(html, text, min_text_length=400):
+    """Heuristically decide whether a static response still needs a browser to render"""
+    if not html or not text:
+        return True
+    if len(text) < min_text_length:
+        return True
+    if EMPTY_SPA_ROOT_PATTERN.search(html):
+        return True
+    if NOSCRIPT_HINT_PATTERN.search(html) and len(text) < min_text_length * 4:
+        return True
+    has_price = PRICE_PATTERN.search(text) or MARKUP_PRICE_PATTERN.search(html)
+    if not has_price:
+        return True
+    return False
+
+
+class FetchStrategy:
+    """Orders fetch approaches per domain, cheapest first, learning which one works"""
+
+    def __init__(self, approaches=('static', 'selenium'), memory_path=None, reprobe_every=50):
+        self.approaches = list(approaches)
+        self.memory_path = memory_path
+        self.reprobe_every = reprobe_every
+        self._lock = threading.Lock()
+        self._domains = {}  # domain -> {"preferred": name, "uses": n, "stats": {name: [ok, failed]}}
+        if memory_path and os.path.exists(memory_path):
+            self.load()
+
+    def order_for(self, url):
+        """Approaches to try for this URL, the domain's known winner first"""
+        with self._lock:
+            entry = self._domains.get(domain_key(url))
+            if not entry or entry["preferred"] not in self.approaches:
+                return list(self.approaches)
+            entry["uses"] += 1
+            preferred = entry["preferred"]
+            # Every so often give the cheapest approach another chance in case the site changed
+            if preferred != self.approaches[0] and entry["uses"] % self.reprobe_every == 0:
+                return list(self.approaches)
+        return [preferred] + [name for name in self.approaches if name != preferred]
+
+    def preferred(self, url):
+        """Approach that last succeeded for the URL's domain, if any"""
+        with self._lock:
+            entry = self._domains.get(domain_key(url))
+            return entry["preferred"] if entry else None
+
+    def record(self, url, approach, success):
+        """Remember the outcome of an approach for the URL's domain"""
+        with self._lock:
+            entry = self._domains.setdefault(domain_key(url), {"preferred": None, "uses": 0, "stats": {}})
+            stats = entry["stats"].setdefault(approach, [0, 0])
+            stats[0 if success else 1] += 1
+            if success:
+                entry["preferred"] = approach
+
+    def load(self):
+        """Load domain memory from memory_path"""
+        try:
+            with open(self.memory_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self._domains.update(data)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load fetch strategy memory: %s", e)
+
+    def save(self):
+        """Persist domain memory to memory_path, if configured"""
+        if not self.memory_path:
+            return
+        with self._lock:
+            data = json.dumps(self._domains, indent=2)
+        tmp_path = self.memory_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.memory_path)
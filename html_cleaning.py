@@ -0,0 +1,311 @@
+import codecs
+import logging
+import re
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:  # optional, faster event parser
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional, C-backed selector library
+    LexborHTMLParser = None
+
+logger = logging.getLogger(__name__)
+
+SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'iframe', 'header', 'footer', 'nav', 'aside'])
+
+# Fastest first; selection falls back along this list when a backend isn't installed
+BACKEND_PREFERENCE = ['lxml', 'selectolax', 'html.parser']
+
+FEED_CHUNK_SIZE = 64 * 1024
+
+# Product markup can sit anywhere in the page, often at the end of <body>; once the text budget is
+# full, streaming reads up to MARKUP_GRACE_BYTES more looking for it, and as much again for the
+# rest of a block whose start has been seen
+MARKUP_GRACE_BYTES = 256 * 1024
+PRODUCT_MARKUP_PATTERN = re.compile(
+    r'(?P<jsonld>"@type"\s*:\s*"Product")|itemtype\s*=\s*["\'][^"\']*schema\.org/Product', re.IGNORECASE
+)
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+# Labels browsers decode as windows-1252, which is a superset of them
+WINDOWS_1252_ALIASES = frozenset(['latin-1', 'iso8859-1', 'ascii'])
+
+
+def sniff_encoding(head, default='utf-8'):
+    """Encoding declared by a <meta> tag in the first KB of a page, else default"""
+    match = META_CHARSET_PATTERN.search(head[:1024])
+    if match:
+        try:
+            name = codecs.lookup(match.group(1).decode('ascii')).name
+        except (LookupError, UnicodeDecodeError):
+            return default
+        return 'cp1252' if name in WINDOWS_1252_ALIASES else name
+    return default
+
+
+class TextBudget:
+    """Collects text nodes, collapsing whitespace on the fly, until a character budget is reached"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.parts = []
+        self.length = 0
+        self.pending_space = False
+
+    @property
+    def full(self):
+        return self.length >= self.limit
+
+    def add(self, data):
+        if not data or self.full:
+            return
+        words = data.split()
+        if not words:
+            self.pending_space = self.length > 0
+            return
+        chunk = ' '.join(words)
+        if self.length and (self.pending_space or data[0].isspace()):
+            chunk = ' ' + chunk
+        self.parts.append(chunk)
+        self.length += len(chunk)
+        self.pending_space = data[-1].isspace()
+
+    def text(self):
+        return ''.join(self.parts)[:self.limit]
+
+
+class _StdlibTarget(HTMLParser):
+    """html.parser event handler that never builds a tree"""
+
+    def __init__(self, budget):
+        super().__init__(convert_charrefs=True)
+        self.budget = budget
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.budget.add(data)
+
+
+class _LxmlTarget:
+    """lxml parser target: receives start/end/data events without building a tree"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.skip_depth = 0
+
+    def start(self, tag, attrib):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def data(self, data):
+        if not self.skip_depth:
+            self.budget.add(data)
+
+    def close(self):
+        return None
+
+
+class StreamingCleaner:
+    """Incremental HTML-to-text cleaner that stops once `limit` characters are collected
+
+    Unwanted subtrees (scripts, navigation, ...) are skipped as they stream past
+    instead of being built and decomposed. Feed str chunks; check `done` to stop early.
+    """
+
+    def __init__(self, limit, backend='html.parser'):
+        self.budget = TextBudget(limit)
+        self.backend = backend
+        if backend == 'lxml':
+            self._parser = etree.HTMLParser(target=_LxmlTarget(self.budget), recover=True,
+                                            no_network=True, remove_comments=True)
+        else:
+            self._parser = _StdlibTarget(self.budget)
+
+    @property
+    def done(self):
+        return self.budget.full
+
+    def feed(self, chunk):
+        if not self.done and chunk:
+            self._parser.feed(chunk)
+
+    def close(self):
+        """Finish parsing and return the cleaned text"""
+        try:
+            self._parser.close()
+        except Exception:
+            pass
+        return self.budget.text()
+
+
+def available_backends():
+    """Backends that can be used in this environment, fastest first"""
+    installed = {'lxml': etree is not None, 'selectolax': LexborHTMLParser is not None, 'html.parser': True}
+    return [name for name in BACKEND_PREFERENCE if installed[name]]
+
+
+def resolve_backend(preferred=None):
+    """Return preferred if installed, otherwise the fastest available backend"""
+    available = available_backends()
+    if preferred in available:
+        return preferred
+    if preferred and preferred not in BACKEND_PREFERENCE:
+        logger.warning("Unknown parser backend %r, using %s", preferred, available[0])
+    return available[0]
+
+
+def _clean_with_selectolax(html, limit):
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(SKIP_TAGS))
+    root = tree.root
+    text = root.text(separator='') if root is not None else ''
+    return re.sub(r'\s+', ' ', text).strip()[:limit]
+
+
+def clean_html_text(html, limit, backend=None):
+    """Visible page text with non-content elements removed, whitespace collapsed, cut to limit"""
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        return _clean_with_selectolax(html, limit)
+    cleaner = StreamingCleaner(limit, backend)
+    for start in range(0, len(html), FEED_CHUNK_SIZE):
+        cleaner.feed(html[start:start + FEED_CHUNK_SIZE])
+        if cleaner.done:
+            break
+    return cleaner.close()
+
+
+class MarkupEnd:
+    """Watches a stream for the end of the product markup block that began at a marker
+
+    JSON-LD ends at its </script>; a microdata scope at the close tag matching the
+    element that carries itemtype. Tags are counted as text arrives, so each piece is
+    scanned once.
+    """
+
+    # Enough of the previous piece to catch a tag split across pieces
+    CARRY = 32
+
+    def __init__(self, text, match):
+        if match.group('jsonld'):
+            tag, self.depth, start = 'script', 1, match.end()
+        else:
+            start = text.rfind('<', 0, match.start())
+            opening = re.match(r'<(\w+)', text[start:]) if start != -1 else None
+            tag, self.depth = (opening.group(1), 0) if opening else (None, 0)
+        self.complete = tag is None
+        self._tags = re.compile(r'<(/?)%s\b' % tag, re.IGNORECASE) if tag else None
+        self._pending = ''
+        if not self.complete:
+            self.feed(text[start:])
+
+    def feed(self, piece):
+        if self.complete:
+            return
+        buffer = self._pending + piece
+        cut = max(0, len(buffer) - self.CARRY)
+        for match in self._tags.finditer(buffer):
+            if match.start() >= cut:
+                break
+            self.depth += -1 if match.group(1) else 1
+            if self.depth == 0:
+                self.complete = True
+                return
+        self._pending = buffer[cut:]
+
+
+def _incremental_decoder(encoding):
+    try:
+        return codecs.getincrementaldecoder(encoding)(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def stream_html(chunks, encoding=None, max_bytes=None, text_limit=None, backend=None, read_all=False):
+    """Decode and clean an HTML byte stream incrementally, reading as little as possible
+
+    Stops after max_bytes, or once text_limit characters of text have been collected
+    and the product markup block (JSON-LD / microdata) has arrived in full, or
+    MARKUP_GRACE_BYTES more have been read without finding it or its end. With
+    read_all only the cleaning stops early and the body is read up to max_bytes,
+    e.g. so the whole page can be cached.
+    Without an encoding (no charset in Content-Type) it is sniffed from a <meta> tag
+    in the first chunk, falling back to UTF-8.
+    Returns (html_prefix, text, bytes_read, stopped_early); text is None without text_limit.
+    """
+    decoder = None
+    cleaner = None
+    if text_limit:
+        # selectolax has no incremental API; stream through the fastest event parser instead
+        backend = resolve_backend(backend)
+        cleaner = StreamingCleaner(text_limit, 'lxml' if backend == 'selectolax' and etree is not None else backend)
+    parts = []
+    bytes_read = 0
+    markup = None
+    markup_at = None
+    stopped_early = False
+    text_full_at = None
+    tail = ''
+    collecting_only = False  # read_all after the text is complete
+    for chunk in chunks:
+        if max_bytes is not None and bytes_read + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - bytes_read]
+        bytes_read += len(chunk)
+        if decoder is None:
+            decoder = _incremental_decoder(encoding or sniff_encoding(chunk))
+        piece = decoder.decode(chunk)
+        parts.append(piece)
+        if max_bytes is not None and bytes_read >= max_bytes:
+            stopped_early = True
+        if collecting_only:
+            if stopped_early:
+                break
+            continue
+        if cleaner is not None:
+            cleaner.feed(piece)
+        if markup is None:
+            # Carry a little of the previous piece over so a marker split across chunks is still found
+            match = PRODUCT_MARKUP_PATTERN.search(tail + piece)
+            if match:
+                markup = MarkupEnd(tail + piece, match)
+                markup_at = bytes_read
+            tail = piece[-100:]
+        else:
+            markup.feed(piece)
+        if stopped_early:
+            break
+        if cleaner is not None and cleaner.done:
+            if read_all:
+                collecting_only = True
+                continue
+            if text_full_at is None:
+                text_full_at = bytes_read
+            if markup is not None:
+                enough = markup.complete or bytes_read - markup_at >= MARKUP_GRACE_BYTES
+            else:
+                enough = bytes_read - text_full_at >= MARKUP_GRACE_BYTES
+            if enough:
+                stopped_early = True
+                break
+    if decoder is not None:
+        parts.append(decoder.decode(b'', final=True))
+    html = ''.join(parts)
+    return html, cleaner.close() if cleaner is not None else None, bytes_read, stopped_early
@@ -0,0 +1,163 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+TRACKING_PARAMS = {
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'gclid', 'fbclid', 'msclkid', 'yclid', 'ref', 'ref_', 'tag', 'srsltid',
+}
+
+CacheEntry = namedtuple('CacheEntry', ['body', 'etag', 'last_modified', 'fetched_at', 'fresh'])
+
+
+def canonical_url(url):
+    """Normalise a URL so trivially different spellings share one cache entry"""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower() or 'https'
+    host = (parsed.hostname or '').lower()
+    if parsed.port and not ((scheme == 'http' and parsed.port == 80) or (scheme == 'https' and parsed.port == 443)):
+        host = f"{host}:{parsed.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                   if k.lower() not in TRACKING_PARAMS)
+    return urlunparse((scheme, host, parsed.path or '/', '', urlencode(query), ''))
+
+
+class HttpCache:
+    """On-disk cache of fetched HTML and rendered page sources
+
+    Bodies are stored gzip-compressed under their SHA-256 digest, so identical
+    pages reached through different URLs are kept once. A SQLite index maps
+    (canonical URL, kind) to a body plus its ETag/Last-Modified validators.
+    """
+
+    def __init__(self, directory='.http_cache', ttl=24 * 3600, max_bytes=512 * 1024 * 1024, offline=False):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' url TEXT NOT NULL, kind TEXT NOT NULL, digest TEXT NOT NULL, size INTEGER NOT NULL,'
+            ' etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL,'
+            ' PRIMARY KEY (url, kind))'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)')
+        self._db.commit()
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, 'blobs', digest[:2], digest + '.gz')
+
+    def get(self, url, kind='static'):
+        """Return the cached CacheEntry for url, or None"""
+        key = canonical_url(url)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT digest, etag, last_modified, fetched_at FROM entries WHERE url = ? AND kind = ?',
+                (key, kind),
+            ).fetchone()
+            if not row:
+                return None
+            self._db.execute('UPDATE entries SET accessed_at = ? WHERE url = ? AND kind = ?',
+                             (time.time(), key, kind))
+            self._db.commit()
+        digest, etag, last_modified, fetched_at = row
+        try:
+            with gzip.open(self._blob_path(digest), 'rb') as f:
+                body = f.read().decode('utf-8')
+        except OSError:
+            self.delete(url, kind)
+            return None
+        fresh = time.time() - fetched_at < self.ttl
+        return CacheEntry(body, etag, last_modified, fetched_at, fresh)
+
+    def put(self, url, body, kind='static', etag=None, last_modified=None):
+        """Store a body for url and evict old entries if over the size budget"""
+        data = body.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb', compresslevel=5) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute('SELECT digest FROM entries WHERE url = ? AND kind = ?',
+                                   (canonical_url(url), kind)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (canonical_url(url), kind, digest, os.path.getsize(path), etag, last_modified, now, now),
+            )
+            self._db.commit()
+            if old and old[0] != digest:
+                self._drop_blob_if_unused(old[0])
+            self._evict()
+
+    def touch(self, url, kind='static'):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            self._db.execute('UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE url = ? AND kind = ?',
+                             (now, now, canonical_url(url), kind))
+            self._db.commit()
+
+    def delete(self, url, kind='static'):
+        """Remove an entry"""
+        with self._lock:
+            row = self._db.execute('SELECT digest FROM entries WHERE url = ? AND kind = ?',
+                                   (canonical_url(url), kind)).fetchone()
+            self._db.execute('DELETE FROM entries WHERE url = ? AND kind = ?', (canonical_url(url), kind))
+            self._db.commit()
+            if row:
+                self._drop_blob_if_unused(row[0])
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Request headers that let the server answer 304 for an unchanged page"""
+        headers = {}
+        if entry and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def _drop_blob_if_unused(self, digest):
+        # Caller holds self._lock
+        in_use = self._db.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone()
+        if in_use:
+            return False
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+        return True
+
+    def _evict(self):
+        # Caller holds self._lock; blobs are shared, so count each digest once
+        total = self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)'
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute('SELECT url, kind, digest, size FROM entries ORDER BY accessed_at').fetchall()
+        for url, kind, digest, size in rows:
+            self._db.execute('DELETE FROM entries WHERE url = ? AND kind = ?', (url, kind))
+            if self._drop_blob_if_unused(digest):
+                total -= size
+            if total <= self.max_bytes:
+                break
+        self._db.commit()
+
+    def close(self):
+        """Close the index database"""
+        with self._lock:
+            self._db.close()
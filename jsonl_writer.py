@@ -0,0 +1,127 @@
+import gzip
+import json
+import os
+import threading
+
+
+def _split_path(path):
+    """('out', '.jsonl.gz') for 'out.jsonl.gz'; other extensions are kept as-is"""
+    for ext in ('.jsonl.gz', '.jsonl', '.gz'):
+        if path.endswith(ext):
+            return path[:-len(ext)], ext
+    return os.path.splitext(path)
+
+
+class JsonlWriter:
+    """Appends one compact JSON record per line as results complete
+
+    Each record is flushed before its URL is appended to a checkpoint file, so an
+    interrupted run can be resumed with resume=True: URLs already in the checkpoint
+    are skipped by pending() and output continues in a new part file, so a record or
+    gzip stream cut off by the crash is never appended to. A crash between the two
+    writes can at worst repeat one record. Existing output is only replaced with
+    overwrite=True; otherwise FileExistsError is raised.
+
+    Records with an 'error' (e.g. fetched during a network outage) are written but
+    not checkpointed, so a resumed run retries them; a later line for the same URL
+    supersedes the earlier one.
+
+    With compress=True parts are gzip files; every record is sync-flushed, so a
+    killed run still leaves readable output. rotate_bytes starts a new part
+    (out.0001.jsonl, out.0002.jsonl, ...) once the current one reaches that size on disk.
+    """
+
+    def __init__(self, path, compress=False, rotate_bytes=None, checkpoint_path=None, resume=False,
+                 overwrite=False):
+        if compress and not path.endswith('.gz'):
+            path += '.gz'
+        self.path = path
+        self.compress = compress
+        self.rotate_bytes = rotate_bytes
+        self.checkpoint_path = checkpoint_path or path + '.checkpoint'
+        self.written = 0
+        self._lock = threading.Lock()
+        self._stem, self._ext = _split_path(path)
+        self._raw = None
+        self._stream = None
+
+        self.completed = set()
+        if resume and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                self.completed.update(line.rstrip('\n') for line in f if line.strip())
+            parts = self._existing_parts()
+            self._index = parts[-1] + 1 if parts else 0
+        else:
+            stale = self._existing_parts()
+            if stale and not overwrite:
+                raise FileExistsError(f"{self._part_path(stale[0])} already exists; resume or overwrite it")
+            self._index = 0
+            for index in stale:
+                os.remove(self._part_path(index))
+            open(self.checkpoint_path, 'w').close()
+        self._checkpoint = open(self.checkpoint_path, 'a', encoding='utf-8')
+        self._open_part()
+
+    def _part_path(self, index):
+        return self.path if index == 0 else f"{self._stem}.{index:04d}{self._ext}"
+
+    def _existing_parts(self):
+        """Indexes of the part files already on disk"""
+        directory = os.path.dirname(self.path) or '.'
+        prefix = os.path.basename(self._stem) + '.'
+        parts = []
+        for name in os.listdir(directory):
+            if name == os.path.basename(self.path):
+                parts.append(0)
+            elif name.startswith(prefix) and name.endswith(self._ext):
+                index = name[len(prefix):len(name) - len(self._ext)]
+                if len(index) == 4 and index.isdigit():
+                    parts.append(int(index))
+        return sorted(parts)
+
+    def _open_part(self):
+        self._raw = open(self._part_path(self._index), 'ab')
+        self._stream = gzip.GzipFile(fileobj=self._raw, mode='ab') if self.compress else self._raw
+
+    def _close_part(self):
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+    def is_done(self, url):
+        return url in self.completed
+
+    def pending(self, urls):
+        """Lazily skip URLs that an earlier run already wrote"""
+        return (url for url in urls if url not in self.completed)
+
+    def write(self, record):
+        """Append a record and, unless it carries an error, mark its URL as done"""
+        line = (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        url = record.get('url')
+        with self._lock:
+            if self.rotate_bytes and self._raw.tell() >= self.rotate_bytes:
+                self._close_part()
+                self._index += 1
+                self._open_part()
+            self._stream.write(line)
+            self._stream.flush()
+            self.written += 1
+            if url and not record.get('error'):
+                self.completed.add(url)
+                self._checkpoint.write(url + '\n')
+                self._checkpoint.flush()
+
+    def close(self):
+        with self._lock:
+            if self._raw is None:
+                return
+            self._close_part()
+            self._raw = self._stream = None
+            self._checkpoint.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
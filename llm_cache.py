@@ -0,0 +1,88 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+
+def llm_cache_key(raw_text, prompt_version, model_id):
+    """Key a structuring result by page content, prompt template and model"""
+    content = re.sub(r'\s+', ' ', raw_text).strip()
+    digest = hashlib.sha256()
+    for part in (prompt_version, model_id, content):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed memo of parsed LLM results with LRU/TTL eviction"""
+
+    def __init__(self, path='llm_cache.sqlite3', ttl=7 * 24 * 3600, max_entries=100000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)')
+        self._db.commit()
+
+    def get(self, key):
+        """Return the cached result dict for key, or None"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT result, created_at FROM results WHERE key = ?', (key,)).fetchone()
+            if row and now - row[1] >= self.ttl:
+                self._db.execute('DELETE FROM results WHERE key = ?', (key,))
+                self._db.commit()
+                self.evictions += 1
+                row = None
+            if not row:
+                self.misses += 1
+                return None
+            self._db.execute('UPDATE results SET accessed_at = ? WHERE key = ?', (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        """Store a parsed result, evicting least recently used entries past max_entries"""
+        now = time.time()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                             (key, json.dumps(result, ensure_ascii=False), now, now))
+            count = self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                self._db.execute(
+                    'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed_at LIMIT ?)',
+                    (excess,),
+                )
+                self.evictions += excess
+            self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters for reporting"""
+        with self._lock:
+            size = self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": size,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,186 @@
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from rate_limiter import RETRY_STATUSES, TokenBucket, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+
+def _generated_text(item):
+    """Pull generated_text out of one element of a text-generation response"""
+    if isinstance(item, list):
+        item = item[0] if item else None
+    if isinstance(item, dict):
+        return item.get('generated_text')
+    return None
+
+
+class LLMClient:
+    """Pooled, rate-limited client for a Hugging Face-style text-generation endpoint
+
+    Concurrent generate() calls from many threads share one keep-alive connection
+    pool. When batch_size > 1 they are coalesced into list-input requests, flushed
+    when batch_size prompts are queued or after batch_wait seconds.
+    """
+
+    def __init__(self, api_url, token=None, max_concurrency=4, requests_per_second=2.0, burst=None,
+                 max_retries=4, backoff=1.0, max_backoff=30.0, timeout=60, batch_size=1, batch_wait=0.05,
+                 parameters=None):
+        self.api_url = api_url
+        self.token = token
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.parameters = parameters or {
+            "max_new_tokens": 500,
+            "temperature": 0.1,
+            "return_full_text": False
+        }
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._bucket = TokenBucket(requests_per_second, burst)
+        self._pending = queue.Queue()
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+        self._closed = False
+
+    def _headers(self):
+        headers = {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    def _post(self, inputs):
+        """POST one request with rate limiting and Retry-After aware retries; returns parsed JSON or None"""
+        payload = {"inputs": inputs, "parameters": self.parameters}
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self._bucket.acquire()
+            with self._slots:
+                try:
+                    response = self.session.post(self.api_url, headers=self._headers(), json=payload,
+                                                 timeout=self.timeout)
+                except requests.RequestException as e:
+                    response = None
+                    error = e
+            if response is not None and response.status_code == 200:
+                return response.json()
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                logger.warning("LLM API error: %s", response.status_code)
+                return None
+            if attempt == self.max_retries:
+                status = response.status_code if response is not None else error
+                logger.warning("LLM API gave up after %d attempts: %s", attempt + 1, status)
+                return None
+            wait = retry_after_seconds(response) if response is not None else None
+            if wait is None:
+                wait = self.backoff * (2 ** attempt)
+                wait = random.uniform(wait / 2, wait)  # jitter so parallel workers don't retry in lockstep
+            time.sleep(min(wait, self.max_backoff))
+        return None
+
+    def _generate_direct(self, prompt):
+        result = self._post(prompt)
+        return _generated_text(result[0]) if isinstance(result, list) and result else None
+
+    def generate(self, prompt):
+        """Generate text for one prompt; None on failure, RuntimeError once closed"""
+        if self.batch_size <= 1:
+            self._check_open()
+            return self._generate_direct(prompt)
+        return self._enqueue(prompt).result()
+
+    def generate_batch(self, prompts):
+        """Generate text for several prompts, batch_size prompts per request"""
+        if self.batch_size <= 1:
+            self._check_open()
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                return list(pool.map(self._generate_direct, prompts))
+        futures = [self._enqueue(prompt) for prompt in prompts]
+        return [future.result() for future in futures]
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("LLMClient is closed")
+
+    def _enqueue(self, prompt):
+        """Queue a prompt for the batcher; the future resolves to its text"""
+        future = Future()
+        # Checked under the lock close() takes, so nothing is queued behind the batcher's stop signal
+        with self._batcher_lock:
+            self._check_open()
+            if self._batcher is None:
+                self._batcher = threading.Thread(target=self._batch_loop, name='llm-batcher', daemon=True)
+                self._batcher.start()
+            self._pending.put((prompt, future))
+        return future
+
+    def _send_batch(self, batch):
+        prompts = [prompt for prompt, _ in batch]
+        result = self._post(prompts) if len(prompts) > 1 else self._post(prompts[0])
+        if isinstance(result, list) and len(result) == len(prompts):
+            texts = [_generated_text(item) for item in result]
+        elif len(prompts) > 1:
+            # Endpoint doesn't accept list inputs; fall back to one request per prompt
+            texts = [self._generate_direct(prompt) for prompt in prompts]
+        else:
+            texts = [None]
+        for (_, future), text in zip(batch, texts):
+            future.set_result(text)
+
+    def _batch_loop(self):
+        workers = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._pending.put(None)
+                    break
+                batch.append(item)
+            workers.submit(self._send_batch_safely, batch)
+        workers.shutdown(wait=True)
+
+    def _send_batch_safely(self, batch):
+        try:
+            self._send_batch(batch)
+        except Exception as e:
+            logger.warning("LLM batch failed: %s", e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    def close(self):
+        """Stop the batcher and close pooled connections; later generate() calls raise RuntimeError"""
+        with self._batcher_lock:
+            if self._closed:
+                return
+            self._closed = True
+            batcher = self._batcher
+            if batcher is not None:
+                self._pending.put(None)
+        if batcher is not None:
+            batcher.join(timeout=self.timeout)
+        self.session.close()
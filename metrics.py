@@ -0,0 +1,227 @@
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = {
+    'stage_seconds': (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    'llm_latency_seconds': (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60),
+    'bytes_fetched': (1e3, 1e4, 1e5, 5e5, 1e6, 2e6, 5e6, 1e7, 5e7),
+    'text_length_chars': (100, 500, 1000, 3000, 5000, 10000, 20000, 50000),
+}
+FALLBACK_BUCKETS = (0.001, 0.01, 0.1, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class Metrics:
+    """Counters, histograms and per-stage spans for one extractor
+
+    Spans time a stage for one URL, feed the stage_seconds histogram, and are
+    optionally written to a JSON-lines file. Stages listed in profile_stages are
+    also run under cProfile; dump_profiles() writes one merged .prof per stage.
+    """
+
+    def __init__(self, jsonl_path=None, profile_stages=(), profile_dir='profiles'):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self._jsonl = open(jsonl_path, 'a', encoding='utf-8') if jsonl_path else None
+        self.profile_stages = set(profile_stages)
+        self.profile_dir = profile_dir
+        self._profiles = {}  # (stage, thread id) -> cProfile.Profile
+        self._local = threading.local()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(DEFAULT_BUCKETS.get(name, FALLBACK_BUCKETS))
+            histogram.observe(value)
+
+    def event(self, kind, **fields):
+        """Write one JSON-lines record, if an exporter file is configured"""
+        if self._jsonl is None:
+            return
+        line = json.dumps({"ts": round(time.time(), 6), "kind": kind, **fields}, ensure_ascii=False, default=str)
+        with self._lock:
+            self._jsonl.write(line + '\n')
+
+    @contextmanager
+    def span(self, stage, url=None):
+        """Time a pipeline stage; nested spans record their parent stage"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else None
+        stack.append(stage)
+        profile = None
+        if stage in self.profile_stages and not getattr(self._local, 'profiling', False):
+            profile = self._start_profile(stage)
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+                self._local.profiling = False
+            stack.pop()
+            self.observe('stage_seconds', elapsed, stage=stage)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("stage %s took %.1f ms for %s", stage, elapsed * 1000, url)
+            self.event('span', stage=stage, parent=parent, url=url, seconds=round(elapsed, 6), error=error)
+
+    def _start_profile(self, stage):
+        # One profiler per (stage, thread): cProfile can't share a Profile between threads
+        key = (stage, threading.get_ident())
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Some other profiler is already active on this thread
+            return None
+        self._local.profiling = True
+        return profile
+
+    def dump_profiles(self):
+        """Write one merged pstats file per profiled stage; returns the paths"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        by_stage = {}
+        with self._lock:
+            for (stage, _), profile in self._profiles.items():
+                by_stage.setdefault(stage, []).append(profile)
+        paths = []
+        for stage, profiles in by_stage.items():
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            path = os.path.join(self.profile_dir, f"{stage}.prof")
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def snapshot(self):
+        """Plain-dict view of all counters and histograms"""
+        with self._lock:
+            counters = [{"name": name, "labels": dict(key), "value": value}
+                        for (name, key), value in self.counters.items()]
+            histograms = [{"name": name, "labels": dict(key), "count": h.count, "sum": round(h.sum, 6),
+                           "buckets": dict(zip(map(str, h.buckets), h.counts))}
+                          for (name, key), h in self.histograms.items()]
+        return {"counters": counters, "histograms": histograms}
+
+    def to_prometheus(self, prefix='product_extractor_'):
+        """Prometheus text exposition of all metrics"""
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for (counter_name, key), value in sorted(self.counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{prefix}{name}{_format_labels(key)} {value}")
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for (histogram_name, key), h in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if histogram_name != name:
+                        continue
+                    for bound, count in zip(h.buckets, h.counts):
+                        lines.append(f"{prefix}{name}_bucket{_format_labels(key, [('le', bound)])} {count}")
+                    lines.append(f"{prefix}{name}_bucket{_format_labels(key, [('le', '+Inf')])} {h.count}")
+                    lines.append(f"{prefix}{name}_sum{_format_labels(key)} {h.sum}")
+                    lines.append(f"{prefix}{name}_count{_format_labels(key)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write the Prometheus text exposition to a file (e.g. for node_exporter's textfile collector)"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def replay(self, records):
+        """Apply metrics recorded elsewhere (see MetricsRecorder) as if they happened here
+
+        Spans recorded without a parent are attributed to the stage open on this thread.
+        """
+        stack = getattr(self._local, 'stack', None)
+        for method, args, fields in records:
+            if method == 'event' and fields.get('parent') is None and stack:
+                fields = {**fields, 'parent': stack[-1]}
+            getattr(self, method)(*args, **fields)
+
+    def close(self):
+        if self._jsonl is not None:
+            with self._lock:
+                self._jsonl.close()
+                self._jsonl = None
+
+
+class MetricsRecorder(Metrics):
+    """Metrics that only keep a log of calls, for a worker process to hand back to its parent
+
+    drain() returns what was recorded since the last call, ready for Metrics.replay().
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._records = []
+
+    def inc(self, name, value=1, **labels):
+        self._records.append(('inc', (name, value), labels))
+
+    def observe(self, name, value, **labels):
+        self._records.append(('observe', (name, value), labels))
+
+    def event(self, kind, **fields):
+        self._records.append(('event', (kind,), fields))
+
+    def drain(self):
+        with self._lock:
+            records, self._records = self._records, []
+        return records
@@ -0,0 +1,154 @@
+"""Local stand-in for the Hugging Face text-generation API
+
+Answers prompts built by build_product_prompt with a plausible product JSON so the
+extractor, LLMClient batching/retries and benchmarks can run fully offline.
+
+    python mock_llm_server.py --port 8089 --latency 0.3 --error-rate 0.05
+    python mock_llm_server.py --load-test 200 --concurrency 16 --batch-size 8
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_PATTERN = re.compile(r'Content:\s*(.*?)\s*JSON:\s*$', re.DOTALL)
+FIELD_PATTERN = re.compile(r'^\s*"(\w+)":', re.MULTILINE)
+PRICE_PATTERN = re.compile(r'[₹$€£]\s*[\d,]+\.?\d*')
+RATING_PATTERN = re.compile(r'(\d+\.\d+)\s*(?:out of|stars?|rating)', re.IGNORECASE)
+
+
+def fake_generation(prompt):
+    """Deterministic 'LLM' answer: a JSON object with the requested fields"""
+    match = CONTENT_PATTERN.search(prompt)
+    content = match.group(1) if match else prompt
+    fields = [name for name in FIELD_PATTERN.findall(prompt.split('Content:')[0])] or ['product_name']
+    price = PRICE_PATTERN.search(content)
+    rating = RATING_PATTERN.search(content)
+    guesses = {
+        'product_name': content.split('.')[0][:80].strip() or None,
+        'price': price.group(0) if price else None,
+        'description': content[:150].strip() or None,
+        'availability': 'In Stock' if re.search(r'in stock|add to cart', content, re.IGNORECASE) else None,
+        'rating': float(rating.group(1)) if rating else None,
+    }
+    return "```json\n" + json.dumps({name: guesses.get(name) for name in fields}) + "\n```"
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._reply(400, {"error": "invalid JSON"})
+            return
+        server.requests_seen += 1
+
+        if server.error_rate and random.random() < server.error_rate:
+            self._reply(429, {"error": "rate limited"}, {'Retry-After': '1'})
+            return
+
+        inputs = payload.get('inputs', '')
+        prompts = inputs if isinstance(inputs, list) else [inputs]
+        # Simulated inference time: fixed latency plus a little per prompt in the batch
+        time.sleep(server.latency + server.per_prompt_latency * len(prompts) + random.uniform(0, server.jitter))
+        outputs = [[{"generated_text": fake_generation(prompt)}] for prompt in prompts]
+        self._reply(200, outputs if isinstance(inputs, list) else outputs[0])
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(host='127.0.0.1', port=0, latency=0.2, per_prompt_latency=0.02, jitter=0.05, error_rate=0.0):
+    """Start the mock server on a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.per_prompt_latency = per_prompt_latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.requests_seen = 0
+    threading.Thread(target=server.serve_forever, name='mock-llm', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/models/mock"
+
+
+def run_load_test(api_url, prompts=200, concurrency=16, batch_size=1, requests_per_second=1000.0):
+    """Drive LLMClient against api_url and report throughput and latency percentiles"""
+    from llm_client import LLMClient
+
+    client = LLMClient(api_url, max_concurrency=concurrency, requests_per_second=requests_per_second,
+                       burst=concurrency, batch_size=batch_size, backoff=0.2)
+    prompt = "Content: Acme Widget. Price $19.99. 4.5 out of 5 stars. In stock.\n\nJSON:"
+    latencies = []
+
+    def one(_):
+        started = time.perf_counter()
+        text = client.generate(prompt)
+        latencies.append(time.perf_counter() - started)
+        return text is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        ok = sum(pool.map(one, range(prompts)))
+    elapsed = time.perf_counter() - started
+    client.close()
+    latencies.sort()
+    return {
+        "prompts": prompts,
+        "succeeded": ok,
+        "seconds": round(elapsed, 3),
+        "prompts_per_second": round(prompts / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Hugging Face inference server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.2, help="base seconds per request")
+    parser.add_argument('--per-prompt-latency', type=float, default=0.02, help="extra seconds per prompt in a batch")
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument('--load-test', type=int, metavar='N', help="send N prompts through LLMClient and exit")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=1)
+    args = parser.parse_args()
+
+    port = 0 if args.load_test else args.port
+    server, url = start_mock_server(args.host, port, args.latency, args.per_prompt_latency,
+                                    args.jitter, args.error_rate)
+    if args.load_test:
+        print(json.dumps(run_load_test(url, args.load_test, args.concurrency, args.batch_size), indent=2))
+        server.shutdown()
+        return
+
+    print(f"Mock LLM listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Staged batch extraction: I/O on threads, parsing on a process pool
+
+Fetch, render and LLM calls spend their time waiting on the network, so they run
+on threads. Cleaning HTML, structured-data parsing, template matching and learning
+and the regex fallback are pure-Python CPU work that would serialize on the GIL; they run
+in worker processes instead. Pages cross the process boundary as UTF-8 bytes and
+come back as compact dicts (a finished record, or the few KB of windowed text the
+LLM needs), never as parse trees or full page text.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from batch import iter_batch
+from fetch_strategy import looks_like_js_shell
+from metrics import MetricsRecorder
+
+logger = logging.getLogger(__name__)
+
+_worker_extractor = None
+
+
+def _init_worker(options):
+    global _worker_extractor
+    from product_extractor import UniversalProductExtractor
+    # Only the CPU-side helpers are used; browsers and network clients are never started
+    _worker_extractor = UniversalProductExtractor(**options)
+    # Spans and histograms go back to the parent with each result
+    _worker_extractor.metrics = MetricsRecorder()
+
+
+def parse_and_extract(url, body, approach, final, template=None):
+    """CPU stage, run in a worker process
+
+    Cleans the page and, unless it is a JavaScript shell that another approach may
+    render better (final=False), analyzes it. Returns a small dict with the text
+    length, the shell verdict, the analysis from _analyze_page and the metrics
+    recorded meanwhile. template is the parent's current template for the domain;
+    None means it has none (it may just have been forgotten as stale).
+    """
+    extractor = _worker_extractor
+    html = body.decode('utf-8', errors='replace')
+    text = extractor._clean_html(html, extractor.text_limits[approach])
+    js_shell = approach == 'static' and looks_like_js_shell(html, text)
+    result = {'text_length': len(text), 'js_shell': js_shell}
+    if not (js_shell and not final):
+        if template:
+            extractor.selector_learner.set_template(url, template)
+        else:
+            extractor.selector_learner.forget(url)
+        result['analysis'] = extractor._analyze_page(url, html, text)
+    result['metrics'] = extractor.metrics.drain()
+    return result
+
+
+def induce_template(body, record):
+    """CPU stage for template learning, run in a worker process; the template or None"""
+    return _worker_extractor.selector_learner.induce(body.decode('utf-8', errors='replace'), record)
+
+
+class ExtractionPipeline:
+    """Runs extractor over many URLs with fetching and parsing in separate stages
+
+    io_workers threads fetch pages and call the LLM (at most per_domain per host);
+    cpu_workers processes parse them. At most cpu_queue pages wait for a parse
+    worker; beyond that fetch threads block, so a slow CPU stage throttles fetching
+    instead of piling up pages in memory.
+    """
+
+    def __init__(self, extractor, cpu_workers=None, io_workers=8, per_domain=2, cpu_queue=None):
+        self.extractor = extractor
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+        self.io_workers = io_workers
+        self.per_domain = per_domain
+        self._cpu_slots = threading.BoundedSemaphore(cpu_queue or self.cpu_workers * 2)
+        options = {
+            'parser_backend': extractor.parser_backend,
+            'rules_path': extractor.rules_path,
+            'llm_token_budget': extractor.llm_token_budget,
+        }
+        # spawn, not fork: the parent already runs HTTP pools and batcher threads
+        self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_worker, initargs=(options,))
+
+    def _parse(self, url, html, approach, final):
+        template = self.extractor.selector_learner.template_for(url)
+        with self._cpu_slots:
+            future = self._cpu_pool.submit(parse_and_extract, url, html.encode('utf-8'), approach, final, template)
+            result = future.result()
+        self.extractor.metrics.replay(result.pop('metrics'))
+        return result
+
+    def _learn(self, url, html, record):
+        """selector_learner.learn with the page parsing done in the process pool"""
+        with self._cpu_slots:
+            template = self._cpu_pool.submit(induce_template, html.encode('utf-8'), record).result()
+        learner = self.extractor.selector_learner
+        if template is None:
+            learner.mark_failed(url)
+        else:
+            learner.set_template(url, template)
+
+    def _extract(self, url):
+        """One URL through the stages, with fetch_page's approach order and fallbacks"""
+        extractor = self.extractor
+        fetchers = {
+            'static': extractor._fetch_static_html,
+            'selenium': extractor._fetch_rendered_html,
+        }
+
+        def attempt(name, final):
+            html = fetchers[name](url)
+            if not html:
+                return None
+            result = self._parse(url, html, name, final)
+            return (html, name, result), result['text_length'], result['js_shell']
+
+        try:
+            logger.info("Extracting from: %s", url)
+            page = extractor._select_page(url, attempt)
+            if page is None:
+                text = extractor._get_url_based_content(url)
+                return extractor._finish_page(url, None, extractor._analyze_page(url, None, text))
+            html, name, result = page
+            if 'analysis' not in result:
+                # A JavaScript shell kept as the fallback; it was not analyzed while other approaches remained
+                result = self._parse(url, html, name, final=True)
+            return extractor._finish_page(url, html, result['analysis'], learn=self._learn)
+        except Exception as e:
+            logger.warning("Extraction failed for %s: %s", url, e)
+            return extractor._create_minimal_response(url, error=str(e))
+
+    def extract_one(self, url):
+        """Like extract_product_data, with parsing done in the process pool"""
+        metrics = self.extractor.metrics
+        with metrics.span('extract', url):
+            record = self._extract(url)
+        metrics.inc('extraction_method_total', method=record.get('extraction_method'))
+        return record
+
+    def run(self, urls, ordered=False):
+        """Yield one record per URL, as they complete unless ordered=True"""
+        return iter_batch(self.extract_one, urls, max_workers=self.io_workers,
+                          per_domain=self.per_domain, ordered=ordered)
+
+    def close(self):
+        self._cpu_pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,75 +1,243 @@
+import argparse
+import hashlib
 import json
+import logging
 import re
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse
 import time
 import random
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+from driver_pool import ChromeDriverPool, wait_until_ready
+from batch import iter_batch, iter_batch_async
+from fetch_strategy import FetchStrategy, looks_like_js_shell
+from http_cache import HttpCache
+from llm_cache import LLMCache, llm_cache_key
+from structured_data import extract_structured_data, merge_structured
+from html_cleaning import FEED_CHUNK_SIZE, clean_html_text, resolve_backend, stream_html
+from content_windowing import select_product_content
+from llm_client import LLMClient
+from rate_limiter import RETRY_STATUSES, PolitenessScheduler, retry_after_seconds
+from selector_induction import SelectorLearner
+from metrics import Metrics
+from jsonl_writer import JsonlWriter
+from recrawl import RecrawlStore, text_fingerprint
+from pipeline import ExtractionPipeline
+from extraction_rules import (
+    BRAND_LABEL_PATTERN, BULLET_PATTERNS, EDGE_NON_WORD_PATTERN, NUMERIC_PATTERN, PRICE_PATTERN,
+    RATING_PATTERN, REVIEWS_PATTERN, SENTENCE_SPLIT_PATTERN, SPEC_PATTERNS, WHITESPACE_PATTERN, get_rule_set,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bounded copy of the rendered DOM; page_source would serialize and transfer all of it
+OUTER_HTML_SCRIPT = 'var root = document.documentElement; return root ? root.outerHTML.substring(0, arguments[0]) : "";'
+
+# Content types worth parsing; anything else is rejected from the response headers alone
+HTML_CONTENT_TYPE_PATTERN = re.compile(r'text/html|application/xhtml\+xml|text/plain', re.IGNORECASE)
+
+# Output schema requested from the LLM; structured data can pre-fill any of these
+PRODUCT_FIELDS = [
+    ('product_name', '"string (extract the main product title)"'),
+    ('price', '"string with currency symbol or null"'),
+    ('description', '"string (brief product description) or null"'),
+    ('image_url', '"string or null"'),
+    ('availability', '"string: \'In Stock\', \'Out of Stock\', \'Pre-order\', or null"'),
+    ('rating', '"number or null"'),
+    ('review_count', '"number or null"'),
+    ('brand', '"string or null"'),
+    ('category', '"string (e.g., Electronics, Fashion, Home, Books, etc.) or null"'),
+    ('specifications', '{"key1": "value1", "key2": "value2"} or null'),
+    ('features', '["feature1", "feature2"] or null'),
+    ('key_features', '["key feature 1", "key feature 2"] or null'),
+]
+
+# When structured data already provides all of these, the LLM is skipped entirely
+ESSENTIAL_FIELDS = ('product_name', 'price', 'availability', 'description', 'brand')
+
+PRODUCT_PROMPT = """
+        Analyze this product webpage content and extract structured information.
+        Return ONLY valid JSON format with these fields:
+        
+        {{
+{fields}
+        }}
+        
+        IMPORTANT: 
+        - Extract only from the provided content
+        - Use null for missing information
+        - Return ONLY JSON, no other text
+        - Be accurate for ANY type of product (electronics, clothing, books, etc.)
+        
+        Content: {content}
+        
+        JSON:
+        """
+
+# Derived from the template text, so editing the prompt invalidates cached LLM results
+PROMPT_VERSION = hashlib.sha256((PRODUCT_PROMPT + repr(PRODUCT_FIELDS)).encode('utf-8')).hexdigest()[:16]
+
+
+def build_product_prompt(raw_text, fields=None):
+    """Fill the prompt template, asking only for the given fields (all by default)"""
+    wanted = [(name, spec) for name, spec in PRODUCT_FIELDS if fields is None or name in fields]
+    field_lines = ',\n'.join(f'          "{name}": {spec}' for name, spec in wanted)
+    return PRODUCT_PROMPT.format(fields=field_lines, content=raw_text)
 
 class UniversalProductExtractor:
-    def __init__(self):
+    def __init__(self, max_drivers=2, strategy_path=None, cache_dir=None, cache_ttl=24 * 3600, offline=False,
+                 llm_cache_path=None, parser_backend=None, rules_path=None, llm_token_budget=1000,
+                 llm_api_url=None, llm_concurrency=4, llm_requests_per_second=2.0, llm_batch_size=1,
+                 template_path=None, metrics_path=None, profile_stages=(), recrawl_path=None,
+                 max_page_bytes=3 * 1024 * 1024):
         self.session = requests.Session()
-        self.huggingface_api_url = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2"
-        self.hf_token = None
+        # Connection-level retries only; throttling and 5xx go through the per-host scheduler
+        retries = Retry(total=2, connect=2, read=1, backoff_factor=0.5, allowed_methods=frozenset(['GET', 'HEAD']),
+                        respect_retry_after_header=False)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=16, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Pooled, rate-limited LLM client; point llm_api_url at mock_llm_server.py to run offline
+        self.llm_client = LLMClient(
+            llm_api_url or "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2",
+            max_concurrency=llm_concurrency,
+            requests_per_second=llm_requests_per_second,
+            batch_size=llm_batch_size,
+        )
+        # Chrome processes are started lazily on first lease and reused across URLs; they load
+        # eagerly and skip images, media, fonts and trackers
+        self.driver_pool = ChromeDriverPool(size=max_drivers)
+        # Upper bound on waiting for rendered product content after DOMContentLoaded, in seconds
+        self.render_wait = 5
+        # Remembers per domain whether static HTML suffices or a browser is needed
+        self.fetch_strategy = FetchStrategy(memory_path=strategy_path)
+        # Cleaned text kept per page; the LLM only sees the best windows of it (llm_token_budget)
+        self.text_limits = {'static': 20000, 'selenium': 20000}
+        # Cap on HTML read per page (bytes when streaming, characters from the browser)
+        self.max_page_bytes = max_page_bytes
+        self.llm_token_budget = llm_token_budget
+        # 'lxml', 'selectolax' or 'html.parser'; falls back to whatever is installed
+        self.parser_backend = resolve_backend(parser_backend)
+        # Regex fallback rule tables, compiled once and shared; rules_path extends them from JSON
+        self.rules_path = rules_path
+        self.rules = get_rule_set(rules_path)
+        # Paces static requests per host (2 s apart by default, or robots.txt's crawl-delay)
+        self.scheduler = PolitenessScheduler(min_interval=2, session=self.session)
+        self.max_fetch_retries = 3
+        # Offline/replay mode serves pages from the cache only and never touches the network
+        self.offline = offline
+        self.http_cache = HttpCache(cache_dir, ttl=cache_ttl, offline=offline) if cache_dir else None
+        self.llm_cache = LLMCache(llm_cache_path) if llm_cache_path else None
+        # Per-domain CSS selector templates learned from LLM results
+        self.selector_learner = SelectorLearner(template_path)
+        # Stage spans, counters and histograms; metrics_path adds a JSON-lines event log and
+        # profile_stages (e.g. ('regex_fallback',)) runs those stages under cProfile
+        self.metrics = Metrics(metrics_path, profile_stages)
+        # Incremental re-crawl: reuse the last LLM record when a page's product text is unchanged
+        self.recrawl = RecrawlStore(recrawl_path) if recrawl_path else None
+    
+    def close(self):
+        """Shut down pooled browsers and the HTTP session"""
+        self.driver_pool.close()
+        self.fetch_strategy.save()
+        self.selector_learner.save()
+        if self.http_cache:
+            self.http_cache.close()
+        if self.llm_cache:
+            self.llm_cache.close()
+        if self.recrawl:
+            self.recrawl.close()
+        self.llm_client.close()
+        self.session.close()
+        if self.metrics.profile_stages:
+            self.metrics.dump_profiles()
+        self.metrics.close()
+    
+    @property
+    def request_delay(self):
+        """Minimum seconds between static requests to the same host"""
+        return self.scheduler.min_interval
+    
+    @request_delay.setter
+    def request_delay(self, value):
+        # Applies to hosts not contacted yet
+        self.scheduler.min_interval = value
+    
+    @property
+    def huggingface_api_url(self):
+        return self.llm_client.api_url
+    
+    @huggingface_api_url.setter
+    def huggingface_api_url(self, value):
+        self.llm_client.api_url = value
+    
+    @property
+    def hf_token(self):
+        return self.llm_client.token
+    
+    @hf_token.setter
+    def hf_token(self, value):
+        self.llm_client.token = value
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+    def _fetch_rendered_html(self, url):
+        """Render the page in a pooled headless Chrome and return its HTML"""
+        cached = self._cache_lookup(url, 'rendered')
+        if cached and (cached.fresh or self.offline):
+            return cached.body
+        if self.offline:
+            return None
         
-    def _scrape_with_selenium(self, url):
-        """Use Selenium to scrape JavaScript-rendered content"""
         try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            
-            # Use WebDriver Manager to automatically handle ChromeDriver
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            driver.set_page_load_timeout(30)
-            
-            driver.get(url)
-            
-            # Wait for product content to load
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-                time.sleep(2)  # Additional wait for dynamic content
-            except:
-                pass
-            
-            # Get page source and parse with BeautifulSoup
-            page_source = driver.page_source
-            driver.quit()
-            
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'noscript', 'iframe', 'header', 'footer', 'nav', 'aside']):
-                element.decompose()
-            
-            # Get clean text
-            text = soup.get_text()
-            text = re.sub(r'\s+', ' ', text).strip()
+            with self.metrics.span('render', url), self.driver_pool.lease() as driver:
+                driver.get(url)
+                
+                # Wait for product content: a learned selector, price text or a quiet network
+                ready = wait_until_ready(driver, self.selector_learner.ready_selector(url), self.render_wait)
+                self.metrics.inc('render_ready_total', reason=ready)
+                
+                # Copy at most max_page_bytes characters of the DOM out of the browser
+                page_source = driver.execute_script(OUTER_HTML_SCRIPT, self.max_page_bytes) or ''
             
-            return text[:5000]  # Limit length
+            self.metrics.observe('bytes_fetched', len(page_source.encode('utf-8')), kind='rendered')
+            if self.http_cache:
+                self.http_cache.put(url, page_source, kind='rendered')
+            return page_source
             
         except Exception as e:
-            print(f"Selenium scraping failed: {e}")
+            logger.warning("Selenium scraping failed for %s: %s", url, e)
             return None
     
-    def _scrape_with_advanced_headers(self, url):
-        """Advanced scraping with realistic headers"""
+    def _fetch_static_html(self, url):
+        """Fetch the raw HTML with realistic headers, without running JavaScript"""
+        return self._fetch_static(url)[0]
+    
+    def _fetch_static_page(self, url):
+        """(html, text) for the static page, cleaning while the body streams in"""
+        html, text = self._fetch_static(url, self.text_limits['static'])
+        if html and text is None:
+            text = self._clean_html(html, self.text_limits['static'])
+        return html, text
+    
+    def _fetch_static(self, url, text_limit=None):
+        """Stream the page within max_page_bytes; returns (html, text)
+        
+        With text_limit the body is cleaned as it arrives and reading stops once enough
+        text (and any product markup) has been seen. text is None for cached pages or
+        without text_limit.
+        """
+        cached = self._cache_lookup(url, 'static')
+        if cached and (cached.fresh or self.offline):
+            return cached.body, None
+        if self.offline:
+            return None, None
+        
         try:
             user_agents = [
                 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -86,46 +254,162 @@ class UniversalProductExtractor:
                 'Upgrade-Insecure-Requests': '1',
                 'Referer': 'https://www.google.com/',
             }
-            
-            time.sleep(2)
-            
-            response = self.session.get(url, headers=headers, timeout=20)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'noscript', 'iframe', 'header', 'footer', 'nav', 'aside']):
-                element.decompose()
-            
-            # Get clean text
-            text = soup.get_text()
-            text = re.sub(r'\s+', ' ', text).strip()
-            
-            return text[:3000]
+            # Revalidate a stale cached copy so an unchanged page costs a bodyless 304
+            headers.update(HttpCache.conditional_headers(cached))
+            
+            for attempt in range(self.max_fetch_retries + 1):
+                self.scheduler.wait(url)
+                with self.metrics.span('fetch_static', url):
+                    response = self.session.get(url, headers=headers, timeout=20, stream=True)
+                if response.status_code not in RETRY_STATUSES:
+                    self.scheduler.success(url)
+                    break
+                response.close()
+                # Slow this host down for every worker, not just this request
+                pause = self.scheduler.backoff(url, retry_after_seconds(response))
+                self.metrics.inc('fetch_retry_total', status=response.status_code)
+                if attempt < self.max_fetch_retries:
+                    logger.info("%s answered %d, retrying in %.1fs", url, response.status_code, pause)
+            
+            with response:
+                if response.status_code == 304 and cached:
+                    self.metrics.inc('cache_total', cache='http', result='revalidated')
+                    self.http_cache.touch(url, 'static')
+                    return cached.body, None
+                response.raise_for_status()
+                
+                # Reject downloads, images, PDFs etc. before reading a byte of the body
+                content_type = response.headers.get('Content-Type', '')
+                if content_type and not HTML_CONTENT_TYPE_PATTERN.search(content_type):
+                    logger.info("Skipping %s: not HTML (%s)", url, content_type)
+                    self.metrics.inc('fetch_rejected_total', reason='content_type')
+                    return None, None
+                
+                # requests assumes ISO-8859-1 when the header declares no charset; stream_html
+                # then looks for a <meta> declaration before settling on UTF-8
+                encoding = response.encoding if 'charset' in content_type.lower() else None
+                # With a cache the whole page (within max_page_bytes) is read so it can be stored
+                # and served to every caller; only the cleaning stops once there is enough text
+                with self.metrics.span('stream_clean', url):
+                    html, text, bytes_read, stopped_early = stream_html(
+                        response.iter_content(FEED_CHUNK_SIZE), encoding, self.max_page_bytes, text_limit,
+                        self.parser_backend, read_all=bool(self.http_cache),
+                    )
+            self.metrics.observe('bytes_fetched', bytes_read, kind='static')
+            if stopped_early:
+                reason = 'budget' if bytes_read >= self.max_page_bytes else 'enough_text'
+                self.metrics.inc('fetch_cutoff_total', reason=reason)
+            if text is not None:
+                self.metrics.observe('text_length_chars', len(text))
+            
+            # Only a max_page_bytes cut is possible here, and every later fetch would cut at the same point
+            if self.http_cache:
+                self.http_cache.put(url, html, kind='static',
+                                    etag=response.headers.get('ETag'),
+                                    last_modified=response.headers.get('Last-Modified'))
+            return html, text
             
         except Exception as e:
-            print(f"Advanced headers scraping failed: {e}")
+            logger.warning("Advanced headers scraping failed for %s: %s", url, e)
+            return None, None
+    
+    def _cache_lookup(self, url, kind):
+        """Cached page of the given kind, counting hits, stale entries and misses"""
+        if not self.http_cache:
             return None
+        cached = self.http_cache.get(url, kind)
+        result = 'miss' if cached is None else 'hit' if cached.fresh else 'stale'
+        self.metrics.inc('cache_total', cache='http', result=result)
+        return cached
+    
+    def _clean_html(self, html, limit):
+        """Strip non-content elements and collapse whitespace, stopping once limit chars are collected"""
+        with self.metrics.span('parse_clean'):
+            text = clean_html_text(html, limit, self.parser_backend)
+        self.metrics.observe('text_length_chars', len(text))
+        return text
+    
+    def _fetch_rendered_page(self, url):
+        """(html, text) for the browser-rendered page"""
+        html = self._fetch_rendered_html(url)
+        return html, self._clean_html(html, self.text_limits['selenium']) if html else None
+    
+    def _scrape_with_selenium(self, url):
+        """Use Selenium to scrape JavaScript-rendered content"""
+        html = self._fetch_rendered_html(url)
+        return self._clean_html(html, self.text_limits['selenium']) if html else None
+    
+    def _scrape_with_advanced_headers(self, url):
+        """Advanced scraping with realistic headers"""
+        return self._fetch_static_page(url)[1]
     
     def extract_text_from_url(self, url):
         """Extract text content from URL with multiple fallbacks"""
-        approaches = [
-            self._scrape_with_selenium,
-            self._scrape_with_advanced_headers,
-        ]
+        return self.fetch_page(url)[1]
+    
+    def fetch_page(self, url):
+        """Return (html, text) for URL, trying the cheap static fetch before a browser
         
-        for approach in approaches:
+        html is None when every approach failed and text was derived from the URL.
+        """
+        fetchers = {
+            'static': self._fetch_static_page,
+            'selenium': self._fetch_rendered_page,
+        }
+        
+        def attempt(name, final):
+            html, text = fetchers[name](url)
+            if not text:
+                return None
+            return (html, text), len(text), name == 'static' and looks_like_js_shell(html, text)
+        
+        page = self._select_page(url, attempt)
+        if page:
+            return page
+        # Final fallback - use URL structure and basic info
+        return None, self._get_url_based_content(url)
+    
+    def _select_page(self, url, attempt):
+        """Try the domain's fetch approaches in order; shared by fetch_page and the pipeline
+        
+        attempt(name, final) fetches and inspects one approach, returning (page, text_length,
+        js_shell) or None when it got nothing; final is True for the last approach. Returns
+        the page of the first approach with real content, else the last JavaScript shell with
+        some text (kept in case the browser does no better), else None.
+        """
+        order = self.fetch_strategy.order_for(url)
+        fallback = None
+        for position, name in enumerate(order):
             try:
-                result = approach(url)
-                if result and len(result) > 100:
-                    return result
+                result = attempt(name, position == len(order) - 1)
             except Exception as e:
-                print(f"Approach {approach.__name__} failed: {e}")
+                logger.warning("Approach %s failed for %s: %s", name, url, e)
+                result = None
+            if result is None:
+                self._record_approach(url, name, False)
                 continue
+            page, text_length, js_shell = result
+            
+            if js_shell:
+                if text_length > 100:
+                    fallback = page
+                self._record_approach(url, name, False, 'js_shell')
+                continue
+            
+            if text_length > 100:
+                self._record_approach(url, name, True)
+                return page
+            self._record_approach(url, name, False)
         
-        # Final fallback - use URL structure and basic info
-        return self._get_url_based_content(url)
+        logger.info("All fetch approaches failed for %s", url)
+        return fallback
+    
+    def _record_approach(self, url, name, success, outcome=None):
+        """Feed an approach outcome to the fetch strategy (cache misses in offline mode don't count)"""
+        self.metrics.inc('fetch_approach_total', approach=name,
+                         outcome=outcome or ('success' if success else 'failed'))
+        if not self.offline:
+            self.fetch_strategy.record(url, name, success)
     
     def _get_url_based_content(self, url):
         """Generate content based on URL structure when scraping fails"""
@@ -144,110 +428,88 @@ class UniversalProductExtractor:
     
     def query_llm(self, prompt):
         """Use Hugging Face's free inference API"""
+        started = time.perf_counter()
         try:
-            headers = {}
-            if self.hf_token:
-                headers["Authorization"] = f"Bearer {self.hf_token}"
-            
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "max_new_tokens": 500,
-                    "temperature": 0.1,
-                    "return_full_text": False
-                }
-            }
-            
-            response = requests.post(
-                self.huggingface_api_url, 
-                headers=headers, 
-                json=payload,
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result[0]['generated_text']
-            else:
-                print(f"LLM API error: {response.status_code}")
-                return None
-                
+            with self.metrics.span('llm'):
+                return self.llm_client.generate(prompt)
         except Exception as e:
-            print(f"LLM query failed: {e}")
+            logger.warning("LLM query failed: %s", e)
             return None
+        finally:
+            self.metrics.observe('llm_latency_seconds', time.perf_counter() - started)
     
-    def structure_with_llm(self, raw_text, url):
-        """Use LLM to structure product data for ANY product type"""
-        prompt = f"""
-        Analyze this product webpage content and extract structured information.
-        Return ONLY valid JSON format with these fields:
-        
-        {{
-          "product_name": "string (extract the main product title)",
-          "price": "string with currency symbol or null",
-          "description": "string (brief product description) or null", 
-          "image_url": "string or null",
-          "availability": "string: 'In Stock', 'Out of Stock', 'Pre-order', or null",
-          "rating": "number or null",
-          "review_count": "number or null",
-          "brand": "string or null",
-          "category": "string (e.g., Electronics, Fashion, Home, Books, etc.) or null",
-          "specifications": {{"key1": "value1", "key2": "value2"}} or null,
-          "features": ["feature1", "feature2"] or null,
-          "key_features": ["key feature 1", "key feature 2"] or null
-        }}
+    def structure_with_llm(self, raw_text, url, fields=None):
+        """Use LLM to structure product data for ANY product type
         
-        IMPORTANT: 
-        - Extract only from the provided content
-        - Use null for missing information
-        - Return ONLY JSON, no other text
-        - Be accurate for ANY type of product (electronics, clothing, books, etc.)
-        
-        Content: {raw_text}
-        
-        JSON:
+        fields restricts the prompt to the schema fields still missing; None asks for all.
         """
+        prompt = build_product_prompt(raw_text, fields)
+        cache_key = None
+        if self.llm_cache:
+            version = PROMPT_VERSION if fields is None else f"{PROMPT_VERSION}:{','.join(sorted(fields))}"
+            cache_key = llm_cache_key(raw_text, version, self.huggingface_api_url)
+            cached = self.llm_cache.get(cache_key)
+            self.metrics.inc('cache_total', cache='llm', result='miss' if cached is None else 'hit')
+            if cached is not None:
+                return self._finish_llm_record(dict(cached), url)
         
         try:
             llm_response = self.query_llm(prompt)
             
-            if llm_response:
-                # Clean and extract JSON from response
-                cleaned_response = re.sub(r'```json|```', '', llm_response).strip()
-                json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
-                
-                if json_match:
-                    product_data = json.loads(json_match.group(0))
-                    product_data['url'] = url
-                    product_data['scraped_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ')
-                    product_data['extraction_method'] = 'llm_analysis'
-                    return product_data
+            product_data = self._parse_llm_json(llm_response) if llm_response else None
+            if product_data is not None:
+                if self.llm_cache:
+                    self.llm_cache.put(cache_key, product_data)
+                return self._finish_llm_record(product_data, url)
             
             # If LLM fails, use regex fallback
             return self._regex_fallback_extraction(raw_text, url)
             
         except Exception as e:
-            print(f"LLM processing failed: {e}")
+            logger.warning("LLM processing failed for %s: %s", url, e)
             return self._regex_fallback_extraction(raw_text, url)
     
+    def _parse_llm_json(self, llm_response):
+        """Repair an LLM answer into a dict: strip code fences and take the outermost JSON object"""
+        with self.metrics.span('json_repair'):
+            cleaned_response = re.sub(r'```json|```', '', llm_response).strip()
+            json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
+            return json.loads(json_match.group(0)) if json_match else None
+    
+    def _finish_llm_record(self, product_data, url):
+        """Stamp a parsed LLM result with its URL and scrape time"""
+        for name, _ in PRODUCT_FIELDS:
+            product_data.setdefault(name, None)
+        product_data['url'] = url
+        product_data['scraped_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ')
+        product_data['extraction_method'] = 'llm_analysis'
+        return product_data
+    
     def _regex_fallback_extraction(self, text, url):
         """Regex-based fallback for when LLM fails"""
+        with self.metrics.span('regex_fallback', url):
+            return self._regex_record(text, url)
+    
+    def _regex_record(self, text, url):
+        """Build the regex fallback record, or a minimal one if that fails"""
         try:
             # Basic pattern matching for common e-commerce data
-            price_match = re.search(r'[₹$€£]\s*[\d,]+\.?\d*', text)
-            rating_match = re.search(r'(\d+\.\d+)\s*(?:out of|stars?|rating)', text, re.IGNORECASE)
-            reviews_match = re.search(r'(\d[\d,]*)\s*(reviews|ratings|customers)', text, re.IGNORECASE)
+            price_match = PRICE_PATTERN.search(text)
+            rating_match = RATING_PATTERN.search(text)
+            reviews_match = REVIEWS_PATTERN.search(text)
+            # One automaton pass fills brand, category and availability
+            keywords = self.rules.scan(text, url)
             
             return {
                 "product_name": self._extract_name_from_url(url),
                 "price": price_match.group(0) if price_match else None,
                 "description": self._extract_description(text),
                 "image_url": None,
-                "availability": self._extract_availability(text),
+                "availability": keywords.get('availability'),
                 "rating": float(rating_match.group(1)) if rating_match else None,
                 "review_count": int(reviews_match.group(1).replace(',', '')) if reviews_match else None,
-                "brand": self._extract_brand(text, url),
-                "category": self._extract_category(text, url),
+                "brand": keywords.get('brand'),
+                "category": keywords.get('category', "General"),
                 "specifications": self._extract_specifications(text),
                 "features": self._extract_features(text),
                 "key_features": self._extract_key_features(text),
@@ -257,7 +519,7 @@ class UniversalProductExtractor:
                 "extraction_method": "regex_fallback"
             }
         except Exception as e:
-            print(f"Regex fallback failed: {e}")
+            logger.warning("Regex fallback failed for %s: %s", url, e)
             return self._create_minimal_response(url)
     
     def _extract_name_from_url(self, url):
@@ -272,7 +534,7 @@ class UniversalProductExtractor:
     
     def _extract_description(self, text):
         """Extract potential description"""
-        sentences = re.split(r'[.!?]', text)
+        sentences = SENTENCE_SPLIT_PATTERN.split(text)
         for sentence in sentences:
             clean_sentence = sentence.strip()
             if 20 <= len(clean_sentence) <= 150:
@@ -281,52 +543,22 @@ class UniversalProductExtractor:
     
     def _extract_availability(self, text):
         """Extract availability status"""
-        text_lower = text.lower()
-        if any(x in text_lower for x in ['out of stock', 'sold out', 'unavailable']):
-            return "Out of Stock"
-        if any(x in text_lower for x in ['pre-order', 'preorder', 'coming soon']):
-            return "Pre-order"
-        if any(x in text_lower for x in ['in stock', 'available', 'add to cart', 'buy now']):
-            return "In Stock"
-        return None
+        return self.rules.scan(text).get('availability')
     
     def _extract_brand(self, text, url):
         """Extract brand information"""
-        brands = ['samsung', 'apple', 'nike', 'adidas', 'sony', 'lg', 'xiaomi', 
-                 'oneplus', 'dell', 'hp', 'lenovo', 'asus', 'canon', 'nikon', 'mi', 'croma']
-        combined_text = (text + ' ' + url).lower()
-        for brand in brands:
-            if brand in combined_text:
-                return brand.capitalize()
-        return None
+        return self.rules.scan(text, url).get('brand')
     
     def _extract_category(self, text, url):
         """Extract product category"""
-        categories = {
-            'electronics': ['phone', 'tv', 'laptop', 'camera', 'headphone', 'electronic', 'smartphone', 'tablet'],
-            'fashion': ['shirt', 'dress', 'shoe', 'jeans', 'fashion', 'clothing', 'apparel', 'wear'],
-            'home': ['furniture', 'kitchen', 'home', 'decor', 'appliance', 'garden', 'living'],
-            'books': ['book', 'novel', 'author', 'publisher', 'literature'],
-            'sports': ['sport', 'fitness', 'gym', 'outdoor', 'exercise', 'training']
-        }
-        
-        combined_text = (text + ' ' + url).lower()
-        for category, keywords in categories.items():
-            if any(keyword in combined_text for keyword in keywords):
-                return category.capitalize()
-        return "General"
+        return self.rules.scan(text, url).get('category', "General")
     
     def _extract_specifications(self, text):
         """Extract product specifications"""
         specs = {}
         # Look for key: value patterns
-        spec_patterns = [
-            r'([A-Za-z\s]+):\s*([^\n\.]+)',
-            r'([A-Za-z\s]+)\s*[-–]\s*([^\n\.]+)'
-        ]
-        
-        for pattern in spec_patterns:
-            matches = re.findall(pattern, text)
+        for pattern in SPEC_PATTERNS:
+            matches = pattern.findall(text)
             for key, value in matches:
                 key = key.strip()
                 value = value.strip()
@@ -339,10 +571,8 @@ class UniversalProductExtractor:
         """Extract product features"""
         features = []
         # Look for bullet points or feature lists
-        bullet_patterns = [r'•\s*(.+?)(?=\.|$)', r'-\s*(.+?)(?=\.|$)', r'\d+\.\s*(.+?)(?=\.|$)']
-        
-        for pattern in bullet_patterns:
-            matches = re.findall(pattern, text)
+        for pattern in BULLET_PATTERNS:
+            matches = pattern.findall(text)
             features.extend([match.strip() for match in matches if 10 <= len(match.strip()) <= 100])
         
         return features[:5] if features else None
@@ -363,63 +593,36 @@ class UniversalProductExtractor:
     
     def _extract_seller(self, text):
         """Extract seller name from text with improved patterns for multiple e-commerce sites"""
-        # Common patterns for seller info across different e-commerce platforms
-        patterns = [
-            # General patterns that work across multiple sites
-            r'Sold\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)(?:\s*\(.*\))?',
-            r'Seller\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)(?:\s*\(.*\))?',
-            r'Fulfilled\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
-            r'Provided\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
-            r'Distributed\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
-            r'Vendor\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
-            r'Retailer\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
-            
-            # Site-specific patterns
-            # Amazon
-            r'Ships from[s\s]*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
-            r'by\s*([A-Za-z0-9 &.,\-]+)(?:\s*\|.*)?$',
-            
-            # eBay
-            r'Sold\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)\s*\(\d+\)',
-            r'from\s*([A-Za-z0-9 &.,\-]+)\s*\(\d+\)',
-            
-            # Walmart
-            r'Sold\s+& shipped by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
-            
-            # Best Buy
-            r'Sold\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)\s*online',
-        ]
-        
-        # First, try to find seller using patterns
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        # Patterns are compiled once per rule set, in priority order
+        for pattern in self.rules.seller_patterns:
+            match = pattern.search(text)
             if match:
                 seller = match.group(1).strip()
                 # Clean up the seller name
-                seller = re.sub(r'^\W+|\W+$', '', seller)  # Remove leading/trailing non-word chars
-                seller = re.sub(r'\s+', ' ', seller)  # Normalize whitespace
+                seller = EDGE_NON_WORD_PATTERN.sub('', seller)  # Remove leading/trailing non-word chars
+                seller = WHITESPACE_PATTERN.sub(' ', seller)  # Normalize whitespace
                 
                 # Validate the seller name
                 if self._is_valid_seller(seller):
                     return seller.title()
         
         # If no pattern matched, try to find seller in common e-commerce phrases
-        lines = text.split('\n')
-        for line in lines:
+        for line in text.split('\n'):
             line_lower = line.lower()
-            if any(phrase in line_lower for phrase in ['sold by', 'seller:', 'fulfilled by', 'provided by']):
-                # Extract the potential seller name after the phrase
-                for phrase in ['sold by', 'seller', 'fulfilled by', 'provided by']:
-                    if phrase in line_lower:
-                        # Use regex to extract text after the phrase
-                        match = re.search(r'{}\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)'.format(phrase), line, re.IGNORECASE)
-                        if match:
-                            potential_seller = match.group(1).strip()
-                            if self._is_valid_seller(potential_seller):
-                                return potential_seller.title()
+            if not any(trigger in line_lower for trigger in self.rules.seller_line_triggers):
+                continue
+            # Extract the potential seller name after the phrase
+            for phrase, phrase_pattern in self.rules.seller_phrases:
+                if phrase not in line_lower:
+                    continue
+                match = phrase_pattern.search(line)
+                if match:
+                    potential_seller = match.group(1).strip()
+                    if self._is_valid_seller(potential_seller):
+                        return potential_seller.title()
         
         # If we still haven't found a seller, try to look for the brand name as a fallback
-        brand_match = re.search(r'Brand\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)', text, re.IGNORECASE)
+        brand_match = BRAND_LABEL_PATTERN.search(text)
         if brand_match:
             brand = brand_match.group(1).strip()
             if self._is_valid_seller(brand):
@@ -432,51 +635,268 @@ class UniversalProductExtractor:
         if not seller or len(seller) < 2 or len(seller) > 50:
             return False
         
-        # Common false positives to exclude
-        false_positives = [
-            'return', 'policy', 'warranty', 'description', 'cart', 'electronics', 
-            'tvs', 'appliances', 'men', 'women', 'baby', 'kids', 'home', 'furniture',
-            'sports', 'books', 'more', 'flights', 'offer', 'zone', 'add', 'buy', 'now',
-            'early', 'bird', 'deals', 'starts', 'in', 'hrs', 'days', 'brand', 'audio',
-            'video', 'support', 'service', 'help', 'contact', 'about', 'information'
-        ]
-        
-        # Check if seller contains any false positive words
-        seller_lower = seller.lower()
-        for fp in false_positives:
-            if fp in seller_lower:
-                return False
+        # Common false positives to exclude, matched with one combined regex
+        if self.rules.is_false_positive(seller):
+            return False
         
         # Check for numeric sellers (e.g., "12345")
-        if re.match(r'^\d+$', seller):
+        if NUMERIC_PATTERN.match(seller):
             return False
         
         return True
     
     def extract_product_data(self, url):
         """Main method to extract product data for ANY product"""
+        with self.metrics.span('extract', url):
+            record = self._extract(url)
+        self.metrics.inc('extraction_method_total', method=record.get('extraction_method'))
+        return record
+    
+    def _extract(self, url):
+        """Fetch, then use the cheapest stage that yields a complete record"""
         try:
-            print(f"🌐 Extracting from: {url}")
-            print("⏳ This may take a moment...")
-            
-            raw_text = self.extract_text_from_url(url)
-            print(f"📝 Content length: {len(raw_text)} characters")
-            
-            # If we have substantial content, try LLM processing
-            if len(raw_text) > 100 and not raw_text.startswith("Product page from"):
-                print("🤖 Analyzing with AI...")
-                product_data = self.structure_with_llm(raw_text, url)
-            else:
-                # Use regex fallback for minimal content
-                product_data = self._regex_fallback_extraction(raw_text, url)
+            logger.info("Extracting from: %s", url)
             
-            return product_data
+            html, raw_text = self.fetch_page(url)
+            logger.debug("Content length: %d characters", len(raw_text))
+            return self._finish_page(url, html, self._analyze_page(url, html, raw_text))
             
         except Exception as e:
-            print(f"❌ Extraction failed: {e}")
-            return self._create_minimal_response(url)
+            logger.warning("Extraction failed for %s: %s", url, e)
+            return self._create_minimal_response(url, error=str(e))
+    
+    def _analyze_page(self, url, html, raw_text):
+        """CPU-only part of extraction (no network, no shared state), so it can run in a worker process
+        
+        Returns {'record': ...} when structured data, a learned template or the regex fallback
+        finished the job, or {'llm_text', 'fields', 'structured'} when the LLM is still needed.
+        """
+        # JSON-LD / microdata / OpenGraph are cheap and usually exact
+        with self.metrics.span('structured_data', url):
+            structured = extract_structured_data(html) if html else {}
+        missing = [name for name, _ in PRODUCT_FIELDS if structured.get(name) in (None, '', {}, [])]
+        
+        structured_complete = bool(structured) and not any(name in missing for name in ESSENTIAL_FIELDS)
+        has_template = not structured_complete and bool(html) and self.selector_learner.has_template(url)
+        templated = self._apply_template(url, html) if has_template else None
+        analysis = {'stale_template': has_template and templated is None}
+        
+        if structured_complete:
+            logger.debug("Structured product data found for %s, skipping the LLM", url)
+            product_data = self._structured_record(url)
+        elif templated is not None:
+            logger.debug("Extracted %s with learned selectors", url)
+            product_data = templated
+        elif len(raw_text) > 100 and not raw_text.startswith("Product page from"):
+            # If we have substantial content, the LLM fills in what is still missing
+            analysis.update(llm_text=select_product_content(raw_text, html, self.llm_token_budget),
+                            fields=missing if structured else None, structured=structured)
+            return analysis
+        else:
+            # Use regex fallback for minimal content
+            product_data = self._regex_fallback_extraction(raw_text, url)
+        
+        analysis['record'] = merge_structured(product_data, structured)
+        return analysis
+    
+    def _finish_page(self, url, html, analysis, learn=None):
+        """I/O part of extraction: re-crawl lookup, LLM call and template learning
+        
+        learn(url, html, record) teaches the domain's template; selector_learner.learn by
+        default, the pipeline runs it in a worker process instead.
+        """
+        if analysis.get('stale_template'):
+            # The site changed; fall back to the LLM, which re-learns the template
+            self.selector_learner.forget(url)
+        if 'record' in analysis:
+            return analysis['record']
+        
+        logger.debug("Analyzing %s with the LLM", url)
+        llm_text, structured = analysis['llm_text'], analysis['structured']
+        product_data = self._recrawl_record(url, llm_text)
+        if product_data is None:
+            product_data = self.structure_with_llm(llm_text, url, fields=analysis['fields'])
+            if product_data.get('extraction_method') == 'llm_analysis':
+                if html and self.selector_learner.should_learn(url):
+                    # Teach the domain's template so later pages can skip the LLM
+                    (learn or self.selector_learner.learn)(url, html, {**product_data, **structured})
+                if self.recrawl:
+                    self._remember_llm_record(url, llm_text, product_data)
+        return merge_structured(product_data, structured)
+    
+    def _remember_llm_record(self, url, llm_text, product_data):
+        """Store the product text fingerprints and LLM record for the next re-crawl"""
+        self.recrawl.put(url, text_fingerprint(llm_text), text_fingerprint(self.rules.mask_volatile(llm_text)),
+                         product_data)
+    
+    def _recrawl_record(self, url, llm_text):
+        """Previous LLM record if the product text is unchanged, with price/stock refreshed by regex
+        when only those moved; None when the LLM has to run
+        """
+        if not self.recrawl:
+            return None
+        previous = self.recrawl.get(url)
+        if previous is None:
+            return None
+        fingerprint, masked_fingerprint, record = previous
+        if text_fingerprint(llm_text) == fingerprint:
+            status = 'unchanged'
+        elif text_fingerprint(self.rules.mask_volatile(llm_text)) == masked_fingerprint:
+            status = 'refreshed'
+            price_match = PRICE_PATTERN.search(llm_text)
+            record['price'] = price_match.group(0) if price_match else None
+            record['availability'] = self.rules.scan(llm_text).get('availability')
+            self._remember_llm_record(url, llm_text, record)
+        else:
+            self.metrics.inc('recrawl_total', result='changed')
+            return None
+        self.metrics.inc('recrawl_total', result=status)
+        logger.debug("Re-crawl of %s: %s, skipping the LLM", url, status)
+        record['scraped_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ')
+        record['extraction_method'] = f"recrawl_{status}"
+        return record
+    
+    def _apply_template(self, url, html):
+        """Record from the domain's learned selectors, or None when they fail validation"""
+        if not html or not self.selector_learner.has_template(url):
+            return None
+        with self.metrics.span('template', url):
+            values = self.selector_learner.apply(url, html)
+        if values is None:
+            return None
+        product_data = self._structured_record(url)
+        product_data.update(values)
+        product_data['extraction_method'] = 'selector_template'
+        return product_data
+    
+    def _structured_record(self, url):
+        """Record skeleton for pages fully described by structured data"""
+        product_data = {name: None for name, _ in PRODUCT_FIELDS}
+        product_data['url'] = url
+        product_data['scraped_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ')
+        product_data['extraction_method'] = None
+        return product_data
+    
+    def _create_minimal_response(self, url, error=None):
+        """Empty record returned when every extraction stage failed"""
+        response = {
+            "product_name": self._extract_name_from_url(url),
+            "price": None,
+            "description": None,
+            "image_url": None,
+            "availability": None,
+            "rating": None,
+            "review_count": None,
+            "brand": None,
+            "category": None,
+            "specifications": None,
+            "features": None,
+            "key_features": None,
+            "seller": None,
+            "url": url,
+            "scraped_at": time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "extraction_method": "minimal_response"
+        }
+        if error:
+            response["error"] = error
+        return response
+    
+    def _safe_extract(self, url):
+        """extract_product_data that never raises, for batch workers"""
+        try:
+            return self.extract_product_data(url)
+        except Exception as e:
+            return self._create_minimal_response(url, error=str(e))
+    
+    def extract_many(self, urls, max_workers=8, per_domain=2, ordered=True):
+        """Extract many URLs concurrently, yielding one record per URL
+        
+        At most max_workers URLs are in flight overall and per_domain per host.
+        Records come back in input order, or as they complete when ordered=False.
+        """
+        return iter_batch(self._safe_extract, urls, max_workers=max_workers,
+                          per_domain=per_domain, ordered=ordered)
+    
+    def extract_many_async(self, urls, max_workers=8, per_domain=2, ordered=True):
+        """Async generator variant of extract_many"""
+        return iter_batch_async(self._safe_extract, urls, max_workers=max_workers,
+                                per_domain=per_domain, ordered=ordered)
+
+def _read_urls(path):
+    """URLs from a text file, one per line; blank lines and # comments are skipped"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith('#'):
+                yield url if url.startswith('http') else 'https://' + url
+
+
+def run_batch(input_path, output_path, compress=False, rotate_mb=None, resume=False, max_workers=8, per_domain=2,
+              recrawl_path=None, cpu_workers=None, overwrite=False):
+    """Extract every URL in input_path into a JSONL file, checkpointing completed URLs
+    
+    With cpu_workers, parsing runs in that many worker processes (see pipeline.py).
+    """
+    rotate_bytes = int(rotate_mb * 1024 * 1024) if rotate_mb else None
+    with JsonlWriter(output_path, compress=compress, rotate_bytes=rotate_bytes, resume=resume,
+                     overwrite=overwrite) as writer:
+        if writer.completed:
+            logger.info("Resuming: %d URLs already done", len(writer.completed))
+        with UniversalProductExtractor(recrawl_path=recrawl_path) as extractor:
+            urls = writer.pending(_read_urls(input_path))
+            pipeline = ExtractionPipeline(extractor, cpu_workers, max_workers, per_domain) if cpu_workers else None
+            try:
+                if pipeline:
+                    records = pipeline.run(urls)
+                else:
+                    records = extractor.extract_many(urls, max_workers=max_workers, per_domain=per_domain,
+                                                     ordered=False)
+                for record in records:
+                    writer.write(record)
+                    if writer.written % 100 == 0:
+                        logger.info("%d records written", writer.written)
+            finally:
+                if pipeline:
+                    pipeline.close()
+        logger.info("Done: %d records written to %s", writer.written, writer.path)
+
 
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Extract structured product data from product pages")
+    parser.add_argument('--serve', action='store_true', help="run the HTTP extraction service (see service.py)")
+    parser.add_argument('--host', default='127.0.0.1', help="address for --serve")
+    parser.add_argument('--port', type=int, default=8080, help="port for --serve")
+    parser.add_argument('--input', help="file with one URL per line; runs in batch mode")
+    parser.add_argument('--output', help="JSONL output file for batch mode (default: products_<timestamp>.jsonl)")
+    parser.add_argument('--gzip', action='store_true', help="gzip the JSONL output")
+    parser.add_argument('--rotate-mb', type=float, help="start a new output part after this many MB")
+    parser.add_argument('--resume', action='store_true', help="skip URLs completed by an earlier run with the same --output")
+    parser.add_argument('--overwrite', action='store_true', help="replace an existing --output instead of refusing")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--per-domain', type=int, default=2)
+    parser.add_argument('--cpu-workers', type=int, help="parse pages in this many worker processes")
+    parser.add_argument('--recrawl-db', help="SQLite file of page fingerprints; unchanged pages skip the LLM")
+    args = parser.parse_args()
+    
+    if args.serve:
+        # service imports this module, so it is only imported when asked for
+        from service import serve
+        serve(args.host, args.port, workers=args.workers, recrawl_path=args.recrawl_db)
+        return
+    
+    if args.input:
+        if args.resume and not args.output:
+            parser.error("--resume needs the --output of the run being resumed")
+        output = args.output or f"products_{int(time.time())}.jsonl"
+        try:
+            run_batch(args.input, output, compress=args.gzip, rotate_mb=args.rotate_mb, resume=args.resume,
+                      max_workers=args.workers, per_domain=args.per_domain, recrawl_path=args.recrawl_db,
+                      cpu_workers=args.cpu_workers, overwrite=args.overwrite)
+        except FileExistsError as e:
+            parser.error(f"{e} (pass --resume or --overwrite)")
+        return
+    
     print("=" * 60)
     print("🌐 UNIVERSAL PRODUCT EXTRACTOR")
     print("=" * 60)
@@ -499,21 +919,24 @@ def main():
     try:
         # Extract data
         result = extractor.extract_product_data(url)
+        output = json.dumps(result, indent=2, ensure_ascii=False)
         
         print("\n" + "=" * 60)
         print("✅ EXTRACTION COMPLETE")
         print("=" * 60)
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(output)
         print("=" * 60)
         
         # Save to file
         filename = f"product_data_{int(time.time())}.json"
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+            f.write(output)
         print(f"💾 Saved to: {filename}")
         
     except Exception as e:
         print(f"❌ Fatal error: {e}")
+    finally:
+        extractor.close()
 
 if __name__ == "__main__":
     main()
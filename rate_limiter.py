@@ -0,0 +1,166 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying after a pause: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(response):
+    """Seconds to wait from a Retry-After header (delta or HTTP date) or HF's estimated_time"""
+    value = response.headers.get('Retry-After')
+    if value:
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    try:
+        # The HF inference API answers 503 {"estimated_time": ...} while a model loads
+        estimated = response.json().get('estimated_time')
+        return float(estimated) if estimated is not None else None
+    except (ValueError, AttributeError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second with bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if available without waiting; return the seconds to wait otherwise"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until tokens are available; False if timeout expires first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _HostState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self.bucket = None  # None means unthrottled
+        self.failures = 0
+        self.blocked_until = 0.0
+
+
+class PolitenessScheduler:
+    """Paces requests per host instead of with one global sleep
+
+    Each host gets its own token bucket allowing one request per min_interval seconds
+    (bursts of `burst`), slowed further by a robots.txt Crawl-delay or Request-rate.
+    After a 429/5xx, backoff() pauses just that host, honouring Retry-After or
+    growing exponentially with jitter; success() resets it.
+    """
+
+    def __init__(self, min_interval=2.0, burst=1, session=None, respect_robots=True, user_agent='*',
+                 backoff=1.0, max_backoff=60.0, robots_timeout=5):
+        self.min_interval = min_interval
+        self.burst = burst
+        self.session = session
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.backoff_base = backoff
+        self.max_backoff = max_backoff
+        self.robots_timeout = robots_timeout
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState()
+        if not state.ready:
+            with state.lock:
+                if not state.ready:
+                    interval = max(self.min_interval, self._robots_interval(parsed.scheme, host) or 0)
+                    if interval > 0:
+                        state.bucket = TokenBucket(1.0 / interval, self.burst)
+                    state.ready = True
+        return state
+
+    def _robots_interval(self, scheme, host):
+        """Seconds between requests asked for by the host's robots.txt, if any"""
+        if not self.respect_robots or self.session is None:
+            return None
+        try:
+            response = self.session.get(f"{scheme}://{host}/robots.txt", timeout=self.robots_timeout)
+            if response.status_code != 200:
+                return None
+            parser = RobotFileParser()
+            parser.parse(response.text.splitlines())
+        except Exception as e:
+            logger.debug("Could not read robots.txt for %s: %s", host, e)
+            return None
+        intervals = []
+        delay = parser.crawl_delay(self.user_agent)
+        if delay:
+            intervals.append(float(delay))
+        rate = parser.request_rate(self.user_agent)
+        if rate and rate.requests:
+            intervals.append(rate.seconds / rate.requests)
+        if intervals:
+            logger.debug("robots.txt for %s asks for %.1fs between requests", host, max(intervals))
+        return max(intervals) if intervals else None
+
+    def wait(self, url):
+        """Block until a request to url's host is allowed"""
+        state = self._host(url)
+        pause = state.blocked_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+        if state.bucket is not None:
+            state.bucket.acquire()
+
+    def backoff(self, url, retry_after=None):
+        """Pause url's host after a throttled/failed response; returns the pause in seconds"""
+        state = self._host(url)
+        with state.lock:
+            state.failures += 1
+            if retry_after is None:
+                pause = min(self.max_backoff, self.backoff_base * (2 ** (state.failures - 1)))
+                pause = random.uniform(pause / 2, pause)  # jitter so parallel workers don't retry in lockstep
+            else:
+                pause = min(retry_after, self.max_backoff)
+            state.blocked_until = max(state.blocked_until, time.monotonic() + pause)
+        return pause
+
+    def success(self, url):
+        """Reset url's host backoff after a good response"""
+        state = self._host(url)
+        with state.lock:
+            state.failures = 0
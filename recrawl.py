@@ -0,0 +1,56 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+
+def text_fingerprint(text):
+    """Whitespace-insensitive digest of a page's product text"""
+    return hashlib.sha256(re.sub(r'\s+', ' ', text).strip().encode('utf-8')).hexdigest()
+
+
+class RecrawlStore:
+    """SQLite memo of the last product text fingerprints and record per URL
+
+    Two fingerprints are kept: one of the exact text, and one with prices and
+    availability phrases masked. An exact match means the page is unchanged; a
+    masked-only match means just price/stock moved.
+    """
+
+    def __init__(self, path='recrawl.sqlite3'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' url TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, masked_fingerprint TEXT NOT NULL,'
+            ' record TEXT NOT NULL, updated_at REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    def get(self, url):
+        """(fingerprint, masked_fingerprint, record) stored for url, or None"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT fingerprint, masked_fingerprint, record FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+        return (row[0], row[1], json.loads(row[2])) if row else None
+
+    def put(self, url, fingerprint, masked_fingerprint, record):
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)',
+                             (url, fingerprint, masked_fingerprint, json.dumps(record, ensure_ascii=False),
+                              time.time()))
+            self._db.commit()
+
+    def forget(self, url):
+        with self._lock:
+            self._db.execute('DELETE FROM pages WHERE url = ?', (url,))
+            self._db.commit()
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._db.close()
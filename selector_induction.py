@@ -0,0 +1,305 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from batch import domain_key
+from extraction_rules import PRICE_PATTERN
+from html_cleaning import etree
+
+logger = logging.getLogger(__name__)
+
+# Fields located in the DOM and turned into per-domain CSS selectors
+TEMPLATE_FIELDS = ('product_name', 'price', 'description', 'image_url', 'availability',
+                   'rating', 'review_count', 'brand')
+# A template is only used when these fields apply and validate
+REQUIRED_FIELDS = ('product_name', 'price')
+SKIP_ELEMENTS = ('script', 'style', 'noscript', 'html', 'body', 'head', 'title', '[document]')
+
+NUMBER_PATTERN = re.compile(r'\d[\d,]*(?:\.\d+)?')
+UNSTABLE_TOKEN_PATTERN = re.compile(r'\d{3,}|[a-z0-9]{6,}-[a-z0-9]{4,}|^css-|^sc-|__[a-zA-Z0-9]{5,}$')
+
+
+def _soup(html):
+    from bs4 import BeautifulSoup  # imported lazily: only needed once a domain has or learns a template
+    return BeautifulSoup(html, 'lxml' if etree is not None else 'html.parser')
+
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+def _stable(token):
+    """Ids/classes that look hand-written rather than generated per build"""
+    return bool(token) and not UNSTABLE_TOKEN_PATTERN.search(token)
+
+
+def _value_from_element(field, element):
+    """Read a field value out of a matched element"""
+    if field == 'image_url':
+        return element.get('src') or element.get('data-src') or element.get('content')
+    text = element.get('content') or element.get_text(' ', strip=True)
+    text = re.sub(r'\s+', ' ', text).strip()
+    if field == 'price':
+        match = PRICE_PATTERN.search(text)
+        return match.group(0) if match else text
+    if field in ('rating', 'review_count'):
+        match = NUMBER_PATTERN.search(text)
+        if not match:
+            return None
+        number = float(match.group(0).replace(',', ''))
+        return number if field == 'rating' else int(number)
+    return text
+
+
+def validate_field(field, value):
+    """Cheap sanity checks so a stale selector falls back to the LLM"""
+    if value in (None, ''):
+        return False
+    if field == 'price':
+        return bool(PRICE_PATTERN.fullmatch(value.strip()) or NUMBER_PATTERN.fullmatch(value.strip()))
+    if field == 'product_name':
+        return 3 <= len(value) <= 300
+    if field == 'rating':
+        return 0 <= value <= 5
+    if field == 'review_count':
+        return value >= 0
+    if field == 'image_url':
+        return value.startswith(('http', '//', '/'))
+    if field == 'availability':
+        return len(value) <= 60
+    return len(value) <= 2000
+
+
+def _values_match(field, expected, found):
+    if expected is None or found is None:
+        return False
+    if field in ('rating', 'review_count'):
+        try:
+            return abs(float(expected) - float(found)) < 0.01
+        except (TypeError, ValueError):
+            return False
+    if field == 'price':
+        digits = lambda value: re.sub(r'[^\d.]', '', str(value)).rstrip('.')
+        return digits(expected) == digits(found)
+    if field == 'image_url':
+        return str(found).split('?')[0].endswith(str(expected).split('?')[0].split('//')[-1])
+    return _normalize(str(expected)) == _normalize(str(found))
+
+
+class SelectorLearner:
+    """Induces per-domain CSS selector templates from successful LLM extractions"""
+
+    def __init__(self, path=None, relearn_after=3600):
+        self.path = path
+        # After a failed attempt a domain isn't tried again for this many seconds: learning
+        # parses the whole page, and most pages of a domain that failed once fail the same way
+        self.relearn_after = relearn_after
+        self._lock = threading.Lock()
+        self._templates = {}  # domain -> {field: selector}
+        self._failed = {}  # domain -> time of the last failed attempt
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._templates = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Could not load selector templates: %s", e)
+
+    def has_template(self, url):
+        with self._lock:
+            return domain_key(url) in self._templates
+
+    def template_for(self, url):
+        """The domain's {field: selector} template, or None"""
+        with self._lock:
+            template = self._templates.get(domain_key(url))
+        return dict(template) if template else None
+
+    def set_template(self, url, template):
+        """Install a template learned elsewhere (e.g. in another process)"""
+        with self._lock:
+            self._templates[domain_key(url)] = dict(template)
+            self._failed.pop(domain_key(url), None)
+
+    def ready_selector(self, url):
+        """Selector whose presence means the domain's product data has rendered, if one was learned"""
+        with self._lock:
+            template = self._templates.get(domain_key(url)) or {}
+        return template.get('price') or template.get('product_name')
+
+    def _find_element(self, soup, field, value):
+        """Smallest element whose own text (or attribute) carries the value"""
+        if field == 'image_url':
+            for img in soup.find_all(['img', 'meta']):
+                candidate = img.get('src') or img.get('data-src') or img.get('content')
+                if candidate and _values_match(field, value, candidate):
+                    return img
+            return None
+        # Only look near text nodes that contain the value, not at every element
+        needle = self._needle(field, value)
+        candidates = []
+        for string in soup.find_all(string=True):
+            node = string.parent
+            if node is None or node.name in SKIP_ELEMENTS or needle not in _normalize(string).replace(',', ''):
+                continue
+            for _ in range(3):
+                if node is None or node.name in SKIP_ELEMENTS:
+                    break
+                candidates.append(node)
+                node = node.parent
+        candidates.extend(soup.find_all(attrs={'content': True}))
+
+        best = None
+        target = _normalize(str(value))
+        for element in candidates:
+            found = _value_from_element(field, element)
+            if not _values_match(field, value, found):
+                continue
+            length = len(_normalize(element.get_text(' ', strip=True)))
+            # Prefer the tightest element: its text should be mostly the value itself
+            if length > max(len(target) * 3, 40):
+                continue
+            if best is None or length < best[0]:
+                best = (length, element)
+        return best[1] if best else None
+
+    @staticmethod
+    def _needle(field, value):
+        """Substring a text node must contain to be near the value"""
+        if field == 'price':
+            match = NUMBER_PATTERN.search(str(value))
+            return match.group(0).replace(',', '') if match else _normalize(str(value))
+        if field in ('rating', 'review_count'):
+            number = float(value)
+            return str(int(number)) if number == int(number) else str(number)
+        return _normalize(str(value))[:30].replace(',', '')
+
+    def _selector_for(self, soup, element):
+        """Shortest stable CSS selector that selects element first"""
+        def unique(selector):
+            try:
+                return soup.select_one(selector) is element
+            except Exception:
+                return False
+
+        if element.name == 'meta':
+            # A meta tag's position in <head> means nothing; key it on what it describes or skip it
+            for attribute in ('property', 'name', 'itemprop'):
+                key = element.get(attribute)
+                if key and '"' not in key:
+                    selector = f'meta[{attribute}="{key}"]'
+                    return selector if unique(selector) else None
+            return None
+
+        candidates = []
+        if element.get('id') and _stable(element['id']):
+            candidates.append(f"#{element['id']}")
+        if element.get('itemprop'):
+            candidates.append(f"{element.name}[itemprop=\"{element['itemprop']}\"]")
+        classes = [c for c in element.get('class', []) if _stable(c)]
+        if classes:
+            candidates.append(element.name + ''.join(f".{c}" for c in classes))
+        for candidate in candidates:
+            if unique(candidate):
+                return candidate
+
+        # Walk up to an anchor with a stable id/class and describe the path from there
+        path = []
+        node = element
+        while node is not None and node.name not in ('[document]', 'html'):
+            siblings = [s for s in node.parent.find_all(node.name, recursive=False)] if node.parent else [node]
+            position = next(i for i, sibling in enumerate(siblings) if sibling is node) + 1
+            step = node.name if len(siblings) == 1 else f"{node.name}:nth-of-type({position})"
+            path.insert(0, step)
+            parent = node.parent
+            if parent is None or parent.name in ('[document]', 'html'):
+                break
+            anchor = None
+            if parent.get('id') and _stable(parent['id']):
+                anchor = f"#{parent['id']}"
+            else:
+                parent_classes = [c for c in parent.get('class', []) if _stable(c)]
+                if parent_classes:
+                    anchor = parent.name + ''.join(f".{c}" for c in parent_classes)
+            if anchor and unique(f"{anchor} > {' > '.join(path)}"):
+                return f"{anchor} > {' > '.join(path)}"
+            node = parent
+        selector = ' > '.join(path)
+        return selector if unique(selector) else None
+
+    def induce(self, html, record):
+        """Template for a page and its correctly extracted record, or None; stores nothing"""
+        soup = _soup(html)
+        template = {}
+        for field in TEMPLATE_FIELDS:
+            value = record.get(field)
+            if value in (None, '', [], {}):
+                continue
+            element = self._find_element(soup, field, value)
+            if element is None:
+                continue
+            selector = self._selector_for(soup, element)
+            if selector and _values_match(field, value, _value_from_element(field, soup.select_one(selector))):
+                template[field] = selector
+        if not all(field in template for field in REQUIRED_FIELDS):
+            return None
+        return template
+
+    def learn(self, url, html, record):
+        """Induce and store a template from a page and its correctly extracted record"""
+        if not html or not record or not self.should_learn(url):
+            return None
+        template = self.induce(html, record)
+        if template is None:
+            self.mark_failed(url)
+        else:
+            self.set_template(url, template)
+        return template
+
+    def mark_failed(self, url):
+        """Record a failed attempt so the domain is skipped for relearn_after seconds"""
+        with self._lock:
+            self._failed[domain_key(url)] = time.monotonic()
+
+    def should_learn(self, url):
+        """False while a recent attempt for the domain failed"""
+        with self._lock:
+            failed_at = self._failed.get(domain_key(url))
+        return failed_at is None or time.monotonic() - failed_at >= self.relearn_after
+
+    def apply(self, url, html):
+        """Extract fields with the domain's template; None if it is missing or fails validation"""
+        with self._lock:
+            template = self._templates.get(domain_key(url))
+        if not template or not html:
+            return None
+        soup = _soup(html)
+        values = {}
+        for field, selector in template.items():
+            try:
+                element = soup.select_one(selector)
+            except Exception:
+                element = None
+            value = _value_from_element(field, element) if element is not None else None
+            if validate_field(field, value):
+                values[field] = value
+            elif field in REQUIRED_FIELDS:
+                return None
+        return values
+
+    def forget(self, url):
+        """Drop a domain's template so it is learned again"""
+        with self._lock:
+            self._templates.pop(domain_key(url), None)
+
+    def save(self):
+        """Persist templates to path, if configured"""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._templates, indent=2, ensure_ascii=False)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
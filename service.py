@@ -0,0 +1,302 @@
+"""Long-running extraction service
+
+Keeps one UniversalProductExtractor (HTTP session, browser pool, caches, learned
+templates) warm across requests and exposes it over HTTP:
+
+    POST /extract         {"url": "..."}            -> one JSON record
+    POST /extract/batch   {"urls": ["...", ...]}    -> JSON lines, streamed as records complete
+    GET  /health                                     -> queue and pool status
+    GET  /metrics                                    -> Prometheus text
+
+    python service.py --port 8080 --workers 4 --max-queue 64
+"""
+import argparse
+import json
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def _is_http_url(url):
+    return isinstance(url, str) and url.startswith(('http://', 'https://'))
+
+
+class ServiceBusy(Exception):
+    """Raised when the request queue is full"""
+
+
+class ExtractionService:
+    """Bounded work queue in front of a shared extractor
+
+    At most `workers` URLs are extracted at once and `max_queue` more may wait;
+    beyond that single requests are refused (503) and batches wait for room.
+    """
+
+    def __init__(self, extractor, workers=4, max_queue=64, timeout=120):
+        self.extractor = extractor
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.started_at = time.time()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='extract')
+        self._admitted = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def submit(self, url, wait_seconds=0):
+        """Queue url for extraction; raises ServiceBusy if no room frees up within wait_seconds"""
+        if wait_seconds:
+            admitted = self._admitted.acquire(timeout=wait_seconds)
+        else:
+            admitted = self._admitted.acquire(blocking=False)
+        if not admitted:
+            raise ServiceBusy()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._pool.submit(self.extractor.extract_product_data, url)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _):
+        with self._lock:
+            self._in_flight -= 1
+        self._admitted.release()
+
+    def extract(self, url):
+        """Extract one URL; raises ServiceBusy or concurrent.futures.TimeoutError"""
+        return self.submit(url).result(timeout=self.timeout)
+
+    def extract_batch(self, urls):
+        """Yield one record per URL as they complete
+
+        URLs are queued as room allows, so a batch never takes more than its share of
+        the queue. A URL that cannot be queued, or does not finish within timeout of
+        the last completed one, yields a minimal record with an error.
+        """
+        urls = iter(urls)
+        running = set()
+        pending_url = next(urls, None)
+        while pending_url is not None or running:
+            # Queue as many URLs as there is room for without blocking
+            while pending_url is not None:
+                try:
+                    future = self.submit(pending_url, wait_seconds=0 if running else self.timeout)
+                except ServiceBusy:
+                    if running:
+                        break
+                    yield self.extractor._create_minimal_response(pending_url, error="service busy")
+                else:
+                    future.url = pending_url
+                    running.add(future)
+                pending_url = next(urls, None)
+            if not running:
+                continue
+            done, _ = wait(running, timeout=self.timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                for future in running:
+                    yield self.extractor._create_minimal_response(future.url, error="timed out")
+                running.clear()
+                continue
+            for future in done:
+                running.discard(future)
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield self.extractor._create_minimal_response(future.url, error=str(e))
+
+    def health(self):
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "in_flight": in_flight,
+            "workers": self.workers,
+            "queue_capacity": self.workers + self.max_queue,
+            "driver_pool": self.extractor.driver_pool.stats(),
+        }
+
+    def prometheus(self):
+        health = self.health()
+        lines = [
+            "# TYPE product_extractor_service_in_flight gauge",
+            f"product_extractor_service_in_flight {health['in_flight']}",
+            "# TYPE product_extractor_service_queue_capacity gauge",
+            f"product_extractor_service_queue_capacity {health['queue_capacity']}",
+        ]
+        return self.extractor.metrics.to_prometheus() + '\n'.join(lines) + '\n'
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+class ExtractionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, self.service.health())
+        elif self.path == '/metrics':
+            self._reply_text(200, self.service.prometheus(), 'text/plain; version=0.0.4')
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path not in ('/extract', '/extract/batch'):
+            self._reply(404, {"error": "not found"})
+            return
+        payload = self._read_json()
+        if payload is None:
+            return
+        if self.path == '/extract':
+            self._extract_one(payload)
+        else:
+            self._extract_batch(payload)
+
+    def send_response(self, code, message=None):
+        # path is not set yet when send_error answers a malformed request line
+        path = getattr(self, 'path', '')
+        if path.startswith('/extract'):
+            self.service.extractor.metrics.inc('service_requests_total', endpoint=path, status=code)
+        super().send_response(code, message)
+
+    def _read_json(self):
+        header = self.headers.get('Content-Length')
+        if header is None:
+            self.close_connection = True
+            self._reply(411, {"error": "Content-Length required"})
+            return None
+        if not header.strip().isdigit():
+            self.close_connection = True  # without a valid length the body can't be skipped
+            self._reply(400, {"error": "invalid Content-Length"})
+            return None
+        length = int(header)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True  # the unread body would otherwise be parsed as the next request
+            self._reply(413, {"error": "request body too large"})
+            return None
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._reply(400, {"error": "invalid JSON"})
+            return None
+        if not isinstance(payload, dict):
+            self._reply(400, {"error": "expected a JSON object"})
+            return None
+        return payload
+
+    def _extract_one(self, payload):
+        url = payload.get('url')
+        if not _is_http_url(url):
+            self._reply(400, {"error": "'url' must be an http(s) URL"})
+            return
+        try:
+            record = self.service.extract(url)
+        except ServiceBusy:
+            self._reply(503, {"error": "queue full, retry later"}, {'Retry-After': '5'})
+            return
+        except FutureTimeout:
+            # concurrent.futures' own TimeoutError, distinct from the builtin before Python 3.11
+            self._reply(504, {"error": "extraction timed out"})
+            return
+        self._reply(200, record)
+
+    def _extract_batch(self, payload):
+        urls = payload.get('urls')
+        if not isinstance(urls, list) or not all(_is_http_url(url) for url in urls):
+            self._reply(400, {"error": "'urls' must be a list of http(s) URLs"})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for record in self.service.extract_batch(urls):
+                self._write_chunk((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+            self._write_chunk(b'')
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client went away during a batch of %d URLs", len(urls))
+            self.close_connection = True
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _reply(self, status, body, headers=None):
+        self._reply_text(status, json.dumps(body, ensure_ascii=False), 'application/json', headers)
+
+    def _reply_text(self, status, text, content_type, headers=None):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(extractor, host='127.0.0.1', port=8080, workers=4, max_queue=64, timeout=120):
+    """HTTP server bound to (host, port) serving extractor; call serve_forever() to run it"""
+    server = ThreadingHTTPServer((host, port), ExtractionHandler)
+    server.daemon_threads = True
+    server.service = ExtractionService(extractor, workers=workers, max_queue=max_queue, timeout=timeout)
+    return server
+
+
+def serve(host='127.0.0.1', port=8080, workers=4, max_queue=64, timeout=120, **extractor_options):
+    """Run the service until interrupted, then shut the extractor down cleanly"""
+    from product_extractor import UniversalProductExtractor
+
+    extractor = UniversalProductExtractor(**extractor_options)
+    server = create_server(extractor, host, port, workers, max_queue, timeout)
+    # SIGTERM (e.g. from a process manager) stops the server like Ctrl-C does
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    logger.info("Serving on http://%s:%d", host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+        extractor.close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Product extraction HTTP service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=4, help="URLs extracted concurrently")
+    parser.add_argument('--max-queue', type=int, default=64, help="URLs allowed to wait before refusing with 503")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds before a single extraction answers 504")
+    parser.add_argument('--cache-dir', help="HTTP cache directory, kept warm across requests")
+    parser.add_argument('--llm-cache', help="SQLite file for cached LLM results")
+    parser.add_argument('--templates', help="JSON file for learned per-domain selector templates")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.max_queue, args.timeout,
+          cache_dir=args.cache_dir, llm_cache_path=args.llm_cache, template_path=args.templates)
+
+
+if __name__ == "__main__":
+    main()
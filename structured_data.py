@@ -0,0 +1,286 @@
+import html as html_lib
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+JSON_LD_PATTERN = re.compile(
+    r'<script[^>]+type\s*=\s*["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL
+)
+META_TAG_PATTERN = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+ATTRIBUTE_PATTERN = re.compile(r'([\w:-]+)\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+)')
+# Start tag (or end tag) plus the text that directly follows it
+TAG_PATTERN = re.compile(r'<(/?)([a-zA-Z][\w:-]*)\b([^>]*)>([^<]*)')
+PRODUCT_SCOPE_PATTERN = re.compile(
+    r'<[a-zA-Z][\w:-]*\b[^>]*\bitemtype\s*=\s*["\']?[^"\'>\s]*schema\.org/Product(?:Group)?\b[^>]*>', re.IGNORECASE
+)
+ITEMSCOPE_PATTERN = re.compile(r'\bitemscope\b', re.IGNORECASE)
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source',
+                       'track', 'wbr'])
+# Props read from scopes nested in the Product, by the itemprop that attaches them: {child prop: product prop}.
+# Other nested scopes (a seller, breadcrumbs, related products) are ignored.
+NESTED_PROPS = {
+    'offers': {'price': 'price', 'lowprice': 'lowprice', 'pricecurrency': 'pricecurrency',
+               'availability': 'availability'},
+    'aggregaterating': {'ratingvalue': 'ratingvalue', 'reviewcount': 'reviewcount', 'ratingcount': 'ratingcount'},
+    'brand': {'name': 'brand'},
+}
+
+CURRENCY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£', 'INR': '₹', 'JPY': '¥', 'CNY': '¥'}
+
+AVAILABILITY_VALUES = {
+    'instock': 'In Stock',
+    'limitedavailability': 'In Stock',
+    'onlineonly': 'In Stock',
+    'instoreonly': 'In Stock',
+    'outofstock': 'Out of Stock',
+    'soldout': 'Out of Stock',
+    'discontinued': 'Out of Stock',
+    'preorder': 'Pre-order',
+    'presale': 'Pre-order',
+    'backorder': 'Pre-order',
+}
+
+
+def _attributes(tag):
+    """Parse the attributes of a single start tag"""
+    attrs = {}
+    for name, value in ATTRIBUTE_PATTERN.findall(tag):
+        if value[:1] in ('"', "'"):
+            value = value[1:-1]
+        attrs[name.lower()] = html_lib.unescape(value).strip()
+    return attrs
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _text(value):
+    """Collapse a schema.org value (string, dict or list) to a plain string"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get('name') or value.get('url') or value.get('@id')
+    if value is None:
+        return None
+    value = re.sub(r'\s+', ' ', html_lib.unescape(str(value))).strip()
+    return value or None
+
+
+def _number(value, cast=float):
+    value = _text(value)
+    if not value:
+        return None
+    match = re.search(r'\d[\d,]*\.?\d*', value)
+    if not match:
+        return None
+    try:
+        return cast(float(match.group(0).replace(',', '')))
+    except ValueError:
+        return None
+
+
+def format_price(amount, currency):
+    """Render a price the way the LLM prompt asks for: with a currency symbol"""
+    amount = _text(amount)
+    if not amount:
+        return None
+    currency = (_text(currency) or '').upper()
+    if currency in CURRENCY_SYMBOLS:
+        return f"{CURRENCY_SYMBOLS[currency]}{amount}"
+    return f"{currency} {amount}".strip()
+
+
+def normalize_availability(value):
+    """Map schema.org / OpenGraph availability values to the extractor's labels"""
+    value = _text(value)
+    if not value:
+        return None
+    key = re.sub(r'[^a-z]', '', value.rsplit('/', 1)[-1].lower())
+    return AVAILABILITY_VALUES.get(key)
+
+
+def _iter_json_ld(html):
+    """Yield every JSON-LD object on the page, flattening lists and @graph"""
+    for block in JSON_LD_PATTERN.findall(html):
+        try:
+            data = json.loads(block.strip(), strict=False)
+        except ValueError:
+            continue
+        stack = _as_list(data)
+        while stack:
+            item = stack.pop(0)
+            if not isinstance(item, dict):
+                continue
+            stack.extend(_as_list(item.get('@graph')))
+            yield item
+
+
+def _has_type(item, name):
+    return any(str(t).lower().endswith(name.lower()) for t in _as_list(item.get('@type')))
+
+
+def _from_json_ld(html):
+    """Product fields from a schema.org Product JSON-LD block"""
+    product = None
+    breadcrumbs = None
+    for item in _iter_json_ld(html):
+        if product is None and (_has_type(item, 'Product') or _has_type(item, 'ProductGroup')):
+            product = item
+        elif breadcrumbs is None and _has_type(item, 'BreadcrumbList'):
+            breadcrumbs = item
+    if product is None:
+        return {}
+
+    data = {
+        'product_name': _text(product.get('name')),
+        'description': _text(product.get('description')),
+        'image_url': _text(product.get('image')),
+        'brand': _text(product.get('brand') or product.get('manufacturer')),
+        'category': _text(product.get('category')),
+    }
+
+    offers = _as_list(product.get('offers'))
+    offer = offers[0] if offers and isinstance(offers[0], dict) else {}
+    if offer:
+        amount = offer.get('price') or offer.get('lowPrice')
+        if amount is None and isinstance(offer.get('priceSpecification'), dict):
+            amount = offer['priceSpecification'].get('price')
+        data['price'] = format_price(amount, offer.get('priceCurrency'))
+        data['availability'] = normalize_availability(offer.get('availability'))
+        data['seller'] = _text(offer.get('seller'))
+
+    rating = product.get('aggregateRating')
+    if isinstance(rating, dict):
+        data['rating'] = _number(rating.get('ratingValue'))
+        data['review_count'] = _number(rating.get('reviewCount') or rating.get('ratingCount'), int)
+
+    specs = {}
+    for prop in _as_list(product.get('additionalProperty')):
+        if isinstance(prop, dict) and _text(prop.get('name')) and _text(prop.get('value')):
+            specs[_text(prop['name'])] = _text(prop['value'])
+    if specs:
+        data['specifications'] = specs
+
+    if not data['category'] and breadcrumbs:
+        names = [_text(element.get('name') or element.get('item'))
+                 for element in _as_list(breadcrumbs.get('itemListElement')) if isinstance(element, dict)]
+        names = [name for name in names if name]
+        if len(names) >= 2:
+            data['category'] = names[-2]
+    return data
+
+
+def _microdata_props(html):
+    """itemprop values of the first schema.org Product scope, first value per prop winning"""
+    start = PRODUCT_SCOPE_PATTERN.search(html)
+    if not start:
+        return {}
+    props = {}
+    stack = []  # (tag, scope) for open elements inside the Product; scope is None for plain elements
+    for match in TAG_PATTERN.finditer(html, start.start()):
+        closing, tag, attrs, inner = match.groups()
+        tag = tag.lower()
+        if closing:
+            if any(open_tag == tag for open_tag, _ in stack):
+                while stack and stack.pop()[0] != tag:
+                    pass
+            if not stack:
+                break  # the Product scope has closed
+            continue
+
+        scope = next((scope for _, scope in reversed(stack) if scope is not None), None)
+        has_scope = not stack or bool(ITEMSCOPE_PATTERN.search(attrs))
+        prop = None
+        if 'itemprop' in attrs.lower():
+            names = _attributes(attrs).get('itemprop', '').lower().split()
+            prop = names[0] if names else None
+        if prop and scope is not None and not has_scope:
+            target = prop if scope == 'product' else NESTED_PROPS.get(scope, {}).get(prop)
+            if target and target not in props:
+                attributes = _attributes(attrs)
+                value = _text(attributes.get('content') or attributes.get('href') or attributes.get('src') or inner)
+                if value:
+                    props[target] = value
+
+        if tag in VOID_TAGS or attrs.rstrip().endswith('/'):
+            if not stack:
+                break
+            continue
+        if not stack:
+            stack.append((tag, 'product'))
+        elif has_scope:
+            stack.append((tag, prop if scope == 'product' and prop in NESTED_PROPS else 'ignored'))
+        else:
+            stack.append((tag, None))
+    return props
+
+
+def _from_microdata(html):
+    """Product fields from the itemprop microdata of a schema.org Product scope"""
+    props = _microdata_props(html)
+    if not props:
+        return {}
+    return {
+        'product_name': props.get('name'),
+        'description': props.get('description'),
+        'image_url': props.get('image'),
+        'brand': props.get('brand'),
+        'price': format_price(props.get('price') or props.get('lowprice'), props.get('pricecurrency')),
+        'availability': normalize_availability(props.get('availability')),
+        'rating': _number(props.get('ratingvalue')),
+        'review_count': _number(props.get('reviewcount') or props.get('ratingcount'), int),
+    }
+
+
+def _from_open_graph(html):
+    """Product fields from OpenGraph / product:* meta tags"""
+    meta = {}
+    for tag in META_TAG_PATTERN.findall(html):
+        attributes = _attributes(tag)
+        key = (attributes.get('property') or attributes.get('name') or '').lower()
+        if key and key not in meta and attributes.get('content'):
+            meta[key] = attributes['content']
+    if not meta:
+        return {}
+    return {
+        'product_name': _text(meta.get('og:title')),
+        'description': _text(meta.get('og:description') or meta.get('description')),
+        'image_url': _text(meta.get('og:image') or meta.get('og:image:url')),
+        'brand': _text(meta.get('product:brand') or meta.get('og:brand')),
+        'price': format_price(meta.get('product:price:amount') or meta.get('og:price:amount'),
+                              meta.get('product:price:currency') or meta.get('og:price:currency')),
+        'availability': normalize_availability(meta.get('product:availability') or meta.get('og:availability')),
+    }
+
+
+def extract_structured_data(html):
+    """Extract product fields from JSON-LD, microdata and OpenGraph, most reliable source first"""
+    if not html:
+        return {}
+    data = {}
+    for source in (_from_json_ld, _from_microdata, _from_open_graph):
+        try:
+            fields = source(html)
+        except Exception as e:
+            logger.debug("Structured data source %s failed: %s", source.__name__, e)
+            continue
+        for key, value in fields.items():
+            if value not in (None, '', {}, []) and data.get(key) in (None, '', {}, []):
+                data[key] = value
+    return data
+
+
+def merge_structured(record, structured):
+    """Overlay structured-data fields on a record produced by another stage"""
+    if not structured:
+        return record
+    for key, value in structured.items():
+        record[key] = value
+    method = record.get('extraction_method')
+    record['extraction_method'] = f"structured_data+{method}" if method else 'structured_data'
+    return record
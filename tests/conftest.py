@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root rather than in a package; the bench helpers
+# (fixture pages and their server) are reused by the tests
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'bench'))
+
+
+@pytest.fixture(scope='session')
+def fixture_site(tmp_path_factory):
+    """The benchmark's fixture pages served over local HTTP; yields (base_url, {name: path})"""
+    from fixtures import build_fixtures
+    from run_bench import start_fixture_server
+
+    directory = str(tmp_path_factory.mktemp('fixtures'))
+    paths = build_fixtures(directory)
+    server, base_url = start_fixture_server(directory)
+    yield base_url, paths
+    server.shutdown()
+
+
+@pytest.fixture
+def mock_llm():
+    """mock_llm_server on a background thread; yields (server, api_url)"""
+    from mock_llm_server import start_mock_server
+
+    server, api_url = start_mock_server(latency=0.0, per_prompt_latency=0.0, jitter=0.0)
+    yield server, api_url
+    server.shutdown()
+
+
+def counter(metrics, name, **labels):
+    """Current value of one labelled counter"""
+    from metrics import _label_key
+
+    return metrics.counters.get((name, _label_key(labels)), 0)
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from batch import iter_batch, iter_batch_async
+
+# A catalog export: every URL of one host, then the next host's
+GROUPED_URLS = [f"https://shop{host}.example/p/{i}" for host in range(4) for i in range(40)]
+
+
+class Probe:
+    """extract stand-in that records the peak number of concurrent calls"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __call__(self, url):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        time.sleep(0.01)
+        with self.lock:
+            self.current -= 1
+        return url
+
+
+async def _collect(aiter):
+    return [item async for item in aiter]
+
+
+@pytest.mark.parametrize('variant', ['threads', 'asyncio'])
+def test_grouped_input_uses_every_domain_slot(variant):
+    probe = Probe()
+    if variant == 'threads':
+        results = list(iter_batch(probe, GROUPED_URLS, max_workers=8, per_domain=2))
+    else:
+        results = asyncio.run(_collect(iter_batch_async(probe, GROUPED_URLS, max_workers=8, per_domain=2)))
+    assert results == GROUPED_URLS
+    # Four hosts at two each; a window filled by the first host alone would cap this at 2
+    assert probe.peak == 8
+
+
+def test_single_domain_input_is_read_lazily():
+    consumed = []
+
+    def urls():
+        for i in range(200000):
+            consumed.append(i)
+            yield f"https://shop.example/p/{i}"
+
+    results = iter_batch(lambda url: url, urls(), max_workers=8, per_domain=2, window=64)
+    assert next(results) == "https://shop.example/p/0"
+    assert len(consumed) <= 64 + 8
+    results.close()
+
+
+def test_ordered_results_stop_new_work_behind_a_slow_url():
+    release = threading.Event()
+    started = []
+
+    def extract(url):
+        started.append(url)
+        if url.endswith('/0'):
+            assert release.wait(5)
+        return url
+
+    urls = [f"https://shop{i % 50}.example/p/{i}" for i in range(500)]
+    results = iter_batch(extract, urls, max_workers=8, per_domain=2, window=16)
+    releaser = threading.Timer(0.3, release.set)
+    releaser.start()
+    assert next(results) == urls[0]
+    # While URL 0 was stuck, at most window finished results (plus the running ones) piled up
+    assert len(started) <= 16 + 8 + 8
+    assert list(results) == urls[1:]
+    releaser.join()
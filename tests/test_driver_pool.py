@@ -0,0 +1,57 @@
+from driver_pool import ChromeDriverPool
+
+
+class _FakeDriver:
+    """Just enough of a selenium WebDriver to record what a reset does"""
+
+    def __init__(self, urls):
+        self.urls = dict(enumerate(urls))
+        self.current = 0
+        self.cdp_commands = []
+        self.visited = []
+
+    @property
+    def window_handles(self):
+        return list(self.urls)
+
+    @property
+    def current_url(self):
+        return self.urls[self.current]
+
+    @property
+    def switch_to(self):
+        driver = self
+
+        class _SwitchTo:
+            def window(self, handle):
+                driver.current = handle
+
+        return _SwitchTo()
+
+    def close(self):
+        del self.urls[self.current]
+
+    def execute_script(self, script, *args):
+        return None
+
+    def delete_all_cookies(self):
+        pass
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+
+    def get(self, url):
+        self.visited.append(url)
+
+
+def test_reset_clears_site_data_of_visited_origins_but_keeps_the_http_cache():
+    driver = _FakeDriver(["https://shop.example/p/1?x=1", "https://pay.example:8443/checkout", "about:blank"])
+    ChromeDriverPool()._reset(driver)
+
+    commands = [command for command, _ in driver.cdp_commands]
+    assert 'Network.clearBrowserCache' not in commands
+    assert 'Network.clearBrowserCookies' in commands
+    cleared = {params['origin'] for command, params in driver.cdp_commands if command == 'Storage.clearDataForOrigin'}
+    assert cleared == {"https://shop.example", "https://pay.example:8443"}
+    assert driver.window_handles == [0]
+    assert driver.visited == ['about:blank']
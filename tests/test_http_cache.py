@@ -0,0 +1,94 @@
+import hashlib
+import os
+
+import pytest
+
+from conftest import counter
+from http_cache import HttpCache
+from product_extractor import UniversalProductExtractor
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    with UniversalProductExtractor(cache_dir=str(tmp_path / 'cache')) as extractor:
+        extractor.request_delay = 0
+        yield extractor
+
+
+@pytest.mark.parametrize('name', ['medium_microdata.html', 'large_react_ssr.html'])
+def test_page_with_enough_text_early_is_cached_whole(extractor, fixture_site, name):
+    base_url, paths = fixture_site
+    url = f"{base_url}/{name}"
+    with open(paths[name], 'r', encoding='utf-8') as f:
+        page = f.read()
+
+    html, text = extractor._fetch_static_page(url)
+    assert html == page and text
+    cached_html, cached_text = extractor._fetch_static_page(url)
+
+    assert counter(extractor.metrics, 'cache_total', cache='http', result='hit') == 1
+    assert cached_html == page
+    assert cached_text == text
+
+
+def test_entries_go_stale_after_ttl(tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=3600)
+    cache.put("https://shop.example/p/1?utm_source=mail", "<html>Widget</html>",
+              last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+    entry = cache.get("https://SHOP.example/p/1")
+    assert entry.body == "<html>Widget</html>" and entry.fresh
+
+    cache.ttl = 0
+    entry = cache.get("https://shop.example/p/1")
+    assert entry.body == "<html>Widget</html>" and not entry.fresh
+    assert HttpCache.conditional_headers(entry) == {'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    bodies = {name: name * 20000 for name in 'abc'}  # distinct, so each gets its own blob
+    cache = HttpCache(str(tmp_path), max_bytes=10 ** 9)
+    cache.put("https://shop.example/a", bodies['a'])
+    blob_size = os.path.getsize(cache._blob_path(hashlib.sha256(bodies['a'].encode()).hexdigest()))
+    cache.max_bytes = blob_size * 2 + blob_size // 2
+    cache.put("https://shop.example/b", bodies['b'])
+    cache.get("https://shop.example/a")
+    cache.put("https://shop.example/c", bodies['c'])
+
+    assert cache.get("https://shop.example/b") is None
+    assert cache.get("https://shop.example/a").body == bodies['a']
+    assert cache.get("https://shop.example/c").body == bodies['c']
+    blobs = [name for _, _, names in os.walk(tmp_path / 'blobs') for name in names]
+    assert len(blobs) == 2
+    cache.close()
+
+
+def test_stale_page_is_revalidated_with_a_conditional_request(tmp_path, fixture_site):
+    base_url, paths = fixture_site
+    url = f"{base_url}/small_jsonld.html"
+    with UniversalProductExtractor(cache_dir=str(tmp_path / 'cache'), cache_ttl=0) as extractor:
+        extractor.request_delay = 0
+        html, _ = extractor._fetch_static_page(url)
+        assert html
+        # The fixture server answers If-Modified-Since with a bodyless 304
+        cached_html, _ = extractor._fetch_static_page(url)
+
+        assert cached_html == html
+        assert counter(extractor.metrics, 'cache_total', cache='http', result='stale') == 1
+        assert counter(extractor.metrics, 'cache_total', cache='http', result='revalidated') == 1
+
+
+def test_offline_mode_serves_only_the_cache(tmp_path, fixture_site):
+    base_url, paths = fixture_site
+    cache_dir = str(tmp_path / 'cache')
+    cached_url, uncached_url = f"{base_url}/small_jsonld.html", f"{base_url}/medium_microdata.html"
+    with UniversalProductExtractor(cache_dir=cache_dir) as extractor:
+        extractor.request_delay = 0
+        html, _ = extractor._fetch_static_page(cached_url)
+        assert html
+
+    with UniversalProductExtractor(cache_dir=cache_dir, cache_ttl=0, offline=True) as extractor:
+        # Stale entries are still served, and nothing is fetched
+        assert extractor._fetch_static_page(cached_url)[0] == html
+        assert extractor._fetch_static_page(uncached_url) == (None, None)
+        assert ('bytes_fetched', (('kind', 'static'),)) not in extractor.metrics.histograms
@@ -0,0 +1,100 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from jsonl_writer import JsonlWriter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _killed_run(path, compress, count):
+    """Write count records in a child process that dies without closing the writer"""
+    script = textwrap.dedent(f"""
+        import os
+        from jsonl_writer import JsonlWriter
+        writer = JsonlWriter({path!r}, compress={compress!r})
+        for i in range({count}):
+            writer.write({{"url": "https://shop.example/p/%d" % i}})
+        os._exit(1)
+    """)
+    subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=False)
+
+
+def _read_records(directory):
+    records = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith('.gz'):
+            # A part left by a killed run has no gzip trailer but every record was sync-flushed
+            data = b''
+            with gzip.open(path, 'rb') as f:
+                try:
+                    while True:
+                        chunk = f.read1(65536)
+                        if not chunk:
+                            break
+                        data += chunk
+                except EOFError:
+                    pass
+        elif name.endswith('.jsonl'):
+            with open(path, 'rb') as f:
+                data = f.read()
+        else:
+            continue
+        records.extend(json.loads(line) for line in data.decode('utf-8').splitlines())
+    return records
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_resume_after_kill(tmp_path, compress):
+    path = str(tmp_path / 'out.jsonl')
+    _killed_run(path, compress, 3)
+
+    urls = [f"https://shop.example/p/{i}" for i in range(5)]
+    with JsonlWriter(path, compress=compress, resume=True) as writer:
+        pending = list(writer.pending(urls))
+        assert pending == urls[3:]
+        for url in pending:
+            writer.write({"url": url})
+
+    assert sorted(r['url'] for r in _read_records(tmp_path)) == urls
+    if compress:
+        # The resumed run's own part is a complete gzip file
+        with gzip.open(str(tmp_path / 'out.0001.jsonl.gz'), 'rt', encoding='utf-8') as f:
+            assert [json.loads(line)['url'] for line in f] == urls[3:]
+
+
+def test_refuses_to_overwrite_existing_output(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    with JsonlWriter(path) as writer:
+        writer.write({"url": "https://shop.example/p/1"})
+
+    with pytest.raises(FileExistsError):
+        JsonlWriter(path)
+    assert len(_read_records(tmp_path)) == 1
+
+    with JsonlWriter(path, overwrite=True) as writer:
+        writer.write({"url": "https://shop.example/p/2"})
+    assert [r['url'] for r in _read_records(tmp_path)] == ["https://shop.example/p/2"]
+
+
+def test_error_records_are_retried_on_resume(tmp_path):
+    path = str(tmp_path / 'out.jsonl')
+    urls = ["https://shop.example/p/1", "https://shop.example/p/2"]
+    with JsonlWriter(path) as writer:
+        writer.write({"url": urls[0], "product_name": "Widget"})
+        writer.write({"url": urls[1], "product_name": None, "error": "Connection refused"})
+
+    with JsonlWriter(path, resume=True) as writer:
+        assert list(writer.pending(urls)) == [urls[1]]
+        writer.write({"url": urls[1], "product_name": "Gadget"})
+
+    with JsonlWriter(path, resume=True) as writer:
+        assert list(writer.pending(urls)) == []
+    records = {(r['url'], r['product_name']) for r in _read_records(tmp_path)}
+    assert records == {(urls[0], 'Widget'), (urls[1], None), (urls[1], 'Gadget')}
@@ -0,0 +1,79 @@
+import pytest
+
+import product_extractor
+from conftest import counter
+from llm_cache import LLMCache, llm_cache_key
+from product_extractor import UniversalProductExtractor
+
+PAGE_TEXT = "Acme Widget. Price $19.99. 4.5 out of 5 stars. In stock."
+URL = "https://shop.example/p/widget"
+
+
+@pytest.fixture
+def make_extractor(tmp_path, mock_llm):
+    _, api_url = mock_llm
+    extractors = []
+
+    def make():
+        extractor = UniversalProductExtractor(llm_cache_path=str(tmp_path / 'llm.sqlite3'), llm_api_url=api_url,
+                                              llm_requests_per_second=1000)
+        extractors.append(extractor)
+        return extractor
+
+    yield make
+    for extractor in extractors:
+        extractor.close()
+
+
+def test_repeated_text_is_answered_from_the_cache(make_extractor, mock_llm):
+    server, _ = mock_llm
+    extractor = make_extractor()
+    first = extractor.structure_with_llm(PAGE_TEXT, URL)
+    # Whitespace differences don't change the key
+    second = extractor.structure_with_llm(f"  {PAGE_TEXT}\n\n", URL)
+    # Nor does a new extractor on the same cache file
+    third = make_extractor().structure_with_llm(PAGE_TEXT, URL)
+
+    assert server.requests_seen == 1
+    assert first['price'] == '$19.99'
+    for record in (second, third):
+        assert {k: v for k, v in record.items() if k != 'scraped_at'} == \
+               {k: v for k, v in first.items() if k != 'scraped_at'}
+    assert counter(extractor.metrics, 'cache_total', cache='llm', result='hit') == 1
+
+
+def test_changed_prompt_or_fields_miss_the_cache(make_extractor, mock_llm, monkeypatch):
+    server, _ = mock_llm
+    extractor = make_extractor()
+    extractor.structure_with_llm(PAGE_TEXT, URL)
+    extractor.structure_with_llm(PAGE_TEXT, URL, fields=['price', 'rating'])
+    assert server.requests_seen == 2
+
+    # PROMPT_VERSION is a digest of the prompt template and schema, so editing either changes it
+    monkeypatch.setattr(product_extractor, 'PROMPT_VERSION', 'edited-prompt')
+    extractor.structure_with_llm(PAGE_TEXT, URL)
+    assert server.requests_seen == 3
+    assert counter(extractor.metrics, 'cache_total', cache='llm', result='hit') == 0
+
+
+def test_cache_key_depends_on_prompt_model_and_content():
+    key = llm_cache_key(PAGE_TEXT, 'v1', 'model-a')
+    assert llm_cache_key(PAGE_TEXT.replace(' ', '   '), 'v1', 'model-a') == key
+    assert llm_cache_key(PAGE_TEXT, 'v2', 'model-a') != key
+    assert llm_cache_key(PAGE_TEXT, 'v1', 'model-b') != key
+    assert llm_cache_key(PAGE_TEXT + " Sale!", 'v1', 'model-a') != key
+
+
+def test_expired_and_least_recently_used_entries_are_dropped(tmp_path):
+    cache = LLMCache(str(tmp_path / 'llm.sqlite3'), max_entries=2)
+    cache.put('a', {'price': '$1'})
+    cache.put('b', {'price': '$2'})
+    assert cache.get('a') == {'price': '$1'}
+    cache.put('c', {'price': '$3'})
+    assert cache.get('b') is None
+    assert cache.get('c') == {'price': '$3'}
+
+    cache.ttl = 0
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 1
+    cache.close()
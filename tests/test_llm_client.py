@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_client import LLMClient
+
+PROMPT = "Content: Acme Widget {}. Price $19.99. In stock.\n\nJSON:"
+
+
+def _client(api_url, **options):
+    options.setdefault('requests_per_second', 1000)
+    return LLMClient(api_url, backoff=0.01, **options)
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_throttled_request_is_retried_after_retry_after(mock_llm):
+    server, api_url = mock_llm
+    server.error_rate = 1.0  # every request answers 429 with Retry-After: 1
+    client = _client(api_url)
+    result = {}
+    started = time.monotonic()
+    thread = threading.Thread(target=lambda: result.update(text=client.generate(PROMPT.format(1))))
+    thread.start()
+    _wait_for(lambda: server.requests_seen == 1)
+    server.error_rate = 0.0
+    thread.join(timeout=10)
+
+    assert '"product_name": "Acme Widget 1"' in result['text']
+    assert server.requests_seen == 2
+    # The server's Retry-After wins over the client's much shorter backoff
+    assert time.monotonic() - started >= 0.9
+    client.close()
+
+
+def test_gives_up_after_max_retries(mock_llm):
+    server, api_url = mock_llm
+    server.error_rate = 1.0
+    client = _client(api_url, max_retries=1)
+    assert client.generate(PROMPT.format(1)) is None
+    assert server.requests_seen == 2
+    client.close()
+
+
+def test_prompts_are_batched_into_list_requests(mock_llm):
+    server, api_url = mock_llm
+    client = _client(api_url, batch_size=4, batch_wait=0.5)
+    texts = client.generate_batch([PROMPT.format(i) for i in range(8)])
+
+    assert server.requests_seen == 2
+    # Answers come back in prompt order
+    assert all(f'"Acme Widget {i}"' in text for i, text in enumerate(texts))
+    client.close()
+
+
+def test_concurrent_generate_calls_share_a_batch(mock_llm):
+    server, api_url = mock_llm
+    client = _client(api_url, batch_size=4, batch_wait=1.0)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        texts = list(pool.map(client.generate, [PROMPT.format(i) for i in range(4)]))
+
+    assert server.requests_seen == 1
+    assert all(f'"Acme Widget {i}"' in text for i, text in enumerate(texts))
+    client.close()
+
+
+def test_generate_after_close_raises(mock_llm):
+    _, api_url = mock_llm
+    for batch_size in (1, 4):
+        client = _client(api_url, batch_size=batch_size)
+        client.generate(PROMPT.format(1))
+        client.close()
+        errors = []
+
+        def generate():
+            try:
+                client.generate(PROMPT.format(2))
+            except RuntimeError as e:
+                errors.append(e)
+
+        # Used to block forever with batching: nothing serves the queue after close()
+        thread = threading.Thread(target=generate, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive() and errors
@@ -0,0 +1,57 @@
+import pytest
+
+from conftest import counter
+from pipeline import ExtractionPipeline
+from product_extractor import UniversalProductExtractor
+
+
+def _extractor(api_url):
+    extractor = UniversalProductExtractor(llm_api_url=api_url, llm_requests_per_second=1000.0)
+    extractor.request_delay = 0
+    extractor.fetch_strategy.approaches = ['static']
+    return extractor
+
+
+def _comparable(record):
+    return {key: value for key, value in record.items() if key != 'scraped_at'}
+
+
+@pytest.fixture(scope='module')
+def pipeline_run(fixture_site, tmp_path_factory):
+    from mock_llm_server import start_mock_server
+
+    server, api_url = start_mock_server(latency=0.0, per_prompt_latency=0.0, jitter=0.0)
+    base_url, paths = fixture_site
+    urls = [f"{base_url}/{name}" for name in sorted(paths)]
+
+    single = _extractor(api_url)
+    single_records = [single.extract_product_data(url) for url in urls]
+    staged = _extractor(api_url)
+    with ExtractionPipeline(staged, cpu_workers=1, io_workers=1, per_domain=1) as pipeline:
+        staged_records = list(pipeline.run(urls, ordered=True))
+    yield urls, (single, single_records), (staged, staged_records)
+    single.close()
+    staged.close()
+    server.shutdown()
+
+
+def test_pipeline_matches_single_process(pipeline_run):
+    _, (_, single_records), (_, staged_records) = pipeline_run
+    assert [_comparable(r) for r in staged_records] == [_comparable(r) for r in single_records]
+
+
+def test_pipeline_records_approaches_like_fetch_page(pipeline_run):
+    urls, (single, _), (staged, _) = pipeline_run
+    spa = next(url for url in urls if url.endswith('spa_shell.html'))
+    for extractor in (single, staged):
+        assert counter(extractor.metrics, 'fetch_approach_total', approach='static', outcome='js_shell') == 1
+        assert extractor.fetch_strategy.order_for(spa) == ['static']
+    for outcome in ('success', 'failed', 'js_shell'):
+        assert (counter(staged.metrics, 'fetch_approach_total', approach='static', outcome=outcome)
+                == counter(single.metrics, 'fetch_approach_total', approach='static', outcome=outcome))
+
+
+def test_pipeline_learns_templates_like_single_process(pipeline_run):
+    urls, (single, _), (staged, _) = pipeline_run
+    for url in urls:
+        assert staged.selector_learner.template_for(url) == single.selector_learner.template_for(url)
@@ -0,0 +1,110 @@
+import email.utils
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from conftest import counter
+from product_extractor import UniversalProductExtractor
+from rate_limiter import PolitenessScheduler, retry_after_seconds
+
+
+class _Response:
+    def __init__(self, headers, body=None):
+        self.headers = headers
+        self._body = body
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("no JSON body")
+        return self._body
+
+
+@pytest.fixture
+def throttling_site():
+    """Serves robots.txt and one product page, answering the page's first request with 429"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/robots.txt':
+                self._reply(200, "User-agent: *\nRequest-rate: 5/1\n")
+                return
+            server.page_requests.append(time.monotonic())
+            if len(server.page_requests) == 1:
+                self._reply(429, "slow down", {'Retry-After': '1'})
+            else:
+                self._reply(200, "<html><body><h1>Acme Widget</h1><p>Price $19.99</p></body></html>")
+
+        def _reply(self, status, text, headers=None):
+            data = text.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.page_requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_retry_after_header_forms():
+    assert retry_after_seconds(_Response({'Retry-After': '7'})) == 7.0
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 28 <= retry_after_seconds(_Response({'Retry-After': date})) <= 30
+    # The HF inference API's model-loading answer
+    assert retry_after_seconds(_Response({}, {'estimated_time': 12.5})) == 12.5
+    assert retry_after_seconds(_Response({})) is None
+
+
+def test_hosts_are_paced_independently():
+    scheduler = PolitenessScheduler(min_interval=0.2, respect_robots=False)
+    started = time.monotonic()
+    for _ in range(3):
+        scheduler.wait("https://a.example/p")
+    a_elapsed = time.monotonic() - started
+    scheduler.wait("https://b.example/p")
+
+    assert 0.35 <= a_elapsed < 1.0
+    assert time.monotonic() - started - a_elapsed < 0.1
+
+
+def test_backoff_pauses_only_the_throttled_host():
+    scheduler = PolitenessScheduler(min_interval=0, respect_robots=False)
+    assert scheduler.backoff("https://a.example/p", retry_after=0.5) == 0.5
+    started = time.monotonic()
+    scheduler.wait("https://b.example/p")
+    assert time.monotonic() - started < 0.1
+    scheduler.wait("https://a.example/q")
+    assert time.monotonic() - started >= 0.45
+
+
+def test_robots_request_rate_slows_the_host(throttling_site):
+    _, base_url = throttling_site
+    scheduler = PolitenessScheduler(min_interval=0.01, session=requests.Session())
+    started = time.monotonic()
+    for _ in range(3):
+        scheduler.wait(f"{base_url}/p")
+    # Request-rate: 5/1 means 0.2 s apart
+    assert time.monotonic() - started >= 0.35
+
+
+def test_static_fetch_waits_out_retry_after(throttling_site):
+    server, base_url = throttling_site
+    with UniversalProductExtractor() as extractor:
+        extractor.request_delay = 0
+        html, text = extractor._fetch_static_page(f"{base_url}/widget")
+
+        assert 'Acme Widget' in html and 'Price $19.99' in text
+        assert counter(extractor.metrics, 'fetch_retry_total', status=429) == 1
+    first, second = server.page_requests
+    assert second - first >= 0.95
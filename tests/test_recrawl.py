@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import counter
+from product_extractor import UniversalProductExtractor
+
+URL = "https://shop.example/p/trail-runner"
+DESCRIPTION = ("Trail Runner 2 is a lightweight running shoe with a grippy outsole, a breathable mesh upper "
+               "and a cushioned midsole for long days on rough ground.")
+
+
+def _page(price="$89.99", stock="In stock", description=DESCRIPTION):
+    return (f"<html><body><h1>Trail Runner 2</h1><p>{description}</p>"
+            f"<p class='price'>{price}</p><p>{stock}</p></body></html>")
+
+
+@pytest.fixture
+def extractor(tmp_path, mock_llm):
+    _, api_url = mock_llm
+    with UniversalProductExtractor(recrawl_path=str(tmp_path / 'recrawl.sqlite3'), llm_api_url=api_url,
+                                   llm_requests_per_second=1000) as extractor:
+        # Keep a learned template from answering before the re-crawl check does
+        extractor.selector_learner.mark_failed(URL)
+        yield extractor
+
+
+def _extract(extractor, html):
+    text = extractor._clean_html(html, extractor.text_limits['static'])
+    return extractor._finish_page(URL, html, extractor._analyze_page(URL, html, text))
+
+
+def test_unchanged_page_reuses_the_previous_record(extractor, mock_llm):
+    server, _ = mock_llm
+    first = _extract(extractor, _page())
+    second = _extract(extractor, _page())
+
+    assert first['extraction_method'] == 'llm_analysis'
+    assert second['extraction_method'] == 'recrawl_unchanged'
+    assert second['product_name'] == first['product_name'] and second['price'] == '$89.99'
+    assert server.requests_seen == 1
+    assert counter(extractor.metrics, 'recrawl_total', result='unchanged') == 1
+
+
+def test_price_and_stock_changes_are_refreshed_without_the_llm(extractor, mock_llm):
+    server, _ = mock_llm
+    first = _extract(extractor, _page())
+    refreshed = _extract(extractor, _page(price="$74.99", stock="Out of stock"))
+    # The refreshed record becomes the baseline for the next visit
+    again = _extract(extractor, _page(price="$74.99", stock="Out of stock"))
+
+    assert refreshed['extraction_method'] == 'recrawl_refreshed'
+    assert refreshed['price'] == '$74.99' and refreshed['availability'] == 'Out of Stock'
+    assert refreshed['product_name'] == first['product_name']
+    assert again['extraction_method'] == 'recrawl_unchanged' and again['price'] == '$74.99'
+    assert server.requests_seen == 1
+
+
+def test_changed_product_text_goes_back_to_the_llm(extractor, mock_llm):
+    server, _ = mock_llm
+    _extract(extractor, _page())
+    changed = _extract(extractor, _page(description=DESCRIPTION.replace("lightweight", "waterproof")))
+
+    assert changed['extraction_method'] == 'llm_analysis'
+    assert server.requests_seen == 2
+    assert counter(extractor.metrics, 'recrawl_total', result='changed') == 1
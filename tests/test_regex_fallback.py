@@ -0,0 +1,110 @@
+import random
+import re
+
+import pytest
+
+from product_extractor import UniversalProductExtractor
+from selector_induction import validate_field
+
+# The seller extraction as it was before its rule tables were compiled, kept as a reference
+BASELINE_SELLER_PATTERNS = [
+    r'Sold\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)(?:\s*\(.*\))?',
+    r'Seller\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)(?:\s*\(.*\))?',
+    r'Fulfilled\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+    r'Provided\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+    r'Distributed\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+    r'Vendor\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+    r'Retailer\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+    r'Ships from[s\s]*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+    r'by\s*([A-Za-z0-9 &.,\-]+)(?:\s*\|.*)?$',
+    r'Sold\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)\s*\(\d+\)',
+    r'from\s*([A-Za-z0-9 &.,\-]+)\s*\(\d+\)',
+    r'Sold\s+& shipped by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)',
+    r'Sold\s+by\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)\s*online',
+]
+BASELINE_FALSE_POSITIVES = [
+    'return', 'policy', 'warranty', 'description', 'cart', 'electronics',
+    'tvs', 'appliances', 'men', 'women', 'baby', 'kids', 'home', 'furniture',
+    'sports', 'books', 'more', 'flights', 'offer', 'zone', 'add', 'buy', 'now',
+    'early', 'bird', 'deals', 'starts', 'in', 'hrs', 'days', 'brand', 'audio',
+    'video', 'support', 'service', 'help', 'contact', 'about', 'information'
+]
+
+
+def baseline_is_valid_seller(seller):
+    if not seller or len(seller) < 2 or len(seller) > 50:
+        return False
+    seller_lower = seller.lower()
+    for fp in BASELINE_FALSE_POSITIVES:
+        if fp in seller_lower:
+            return False
+    if re.match(r'^\d+$', seller):
+        return False
+    return True
+
+
+def baseline_extract_seller(text):
+    for pattern in BASELINE_SELLER_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            seller = match.group(1).strip()
+            seller = re.sub(r'^\W+|\W+$', '', seller)
+            seller = re.sub(r'\s+', ' ', seller)
+            if baseline_is_valid_seller(seller):
+                return seller.title()
+    for line in text.split('\n'):
+        line_lower = line.lower()
+        if any(phrase in line_lower for phrase in ['sold by', 'seller:', 'fulfilled by', 'provided by']):
+            for phrase in ['sold by', 'seller', 'fulfilled by', 'provided by']:
+                if phrase in line_lower:
+                    match = re.search(r'{}\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)'.format(phrase), line, re.IGNORECASE)
+                    if match:
+                        potential_seller = match.group(1).strip()
+                        if baseline_is_valid_seller(potential_seller):
+                            return potential_seller.title()
+    brand_match = re.search(r'Brand\s*[:\-]?\s*([A-Za-z0-9 &.,\-]+)', text, re.IGNORECASE)
+    if brand_match:
+        brand = brand_match.group(1).strip()
+        if baseline_is_valid_seller(brand):
+            return brand.title()
+    return None
+
+
+TOKENS = [
+    'sold by', 'Sold By', 'SOLD BY', 'seller', 'Seller:', 'seller -', 'available seller', 'fulfilled by',
+    'Provided by', 'distributed by', 'vendor', 'retailer', 'ships from', 'by', 'from', 'brand:', 'Brand',
+    'online', '& shipped by', 'Acme', 'Globex Corp', 'Initech', 'J&J Goods', 'st. louis', '12345', '(42)',
+    '(note)', '|', ':', '-', '.', ',', '&', 'return policy', 'home', 'deals', 'warranty', 'in stock',
+    'x', 'Ab', '\n', '\n', ' ', '  ',
+]
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    with UniversalProductExtractor() as extractor:
+        yield extractor
+
+
+def test_seller_matches_baseline_on_randomized_inputs(extractor):
+    rng = random.Random(20240611)
+    for _ in range(20000):
+        text = ' '.join(rng.choice(TOKENS) for _ in range(rng.randint(1, 12)))
+        assert extractor._extract_seller(text) == baseline_extract_seller(text), repr(text)
+
+
+def test_seller_phrase_needs_a_trigger_on_its_line(extractor):
+    assert extractor._extract_seller('available seller 12345 -') is None
+    assert extractor._extract_seller('Seller: Acme Store') == 'Acme Store'
+
+
+@pytest.mark.parametrize('text, price', [
+    ("Trail Runner 2. Now ₹1,299.00 with free delivery", "₹1,299.00"),
+    ("Trail Runner 2. Price: USD 89.99", "USD 89.99"),
+    ("Trail Runner 2. Only ¥12,800 today", "¥12,800"),
+    ("Trail Runner 2. Rs. 499 incl. taxes", "Rs. 499"),
+    ("Trail Runner 2, model 2024, in 3 colours", None),
+])
+def test_fallback_and_template_checks_agree_on_prices(extractor, text, price):
+    assert extractor._regex_fallback_extraction(text, "https://shop.example/p/1")['price'] == price
+    if price:
+        assert validate_field('price', price)
@@ -0,0 +1,45 @@
+import re
+
+from selector_induction import SelectorLearner
+from structured_data import extract_structured_data
+
+URL = 'https://tv.example/p/orbit-55'
+
+
+def test_meta_tags_are_selected_by_property_not_position(fixture_site):
+    _, paths = fixture_site
+    with open(paths['large_react_ssr.html'], 'r', encoding='utf-8') as f:
+        html = f.read()
+    learner = SelectorLearner()
+    template = learner.learn(URL, html, extract_structured_data(html))
+    assert template['product_name'] == 'meta[property="og:title"]'
+    assert not any('nth-of-type' in selector for selector in template.values() if selector.startswith('meta'))
+
+    # Reordered <head>: the template still reads the same values
+    metas = re.findall(r'<meta[^>]*>', html)
+    reordered = html
+    for meta in metas:
+        reordered = reordered.replace(meta, '', 1)
+    reordered = reordered.replace('<head>', '<head>' + ''.join(reversed(metas)), 1)
+    values = learner.apply(URL, reordered)
+    assert values['product_name'] == 'Orbit 55" 4K Smart TV'
+    assert values['image_url'] == 'https://cdn.example.com/orbit-55.jpg'
+
+
+def test_failed_domains_are_not_relearned_for_a_while(monkeypatch):
+    import selector_induction
+
+    parses = []
+    real_soup = selector_induction._soup
+    monkeypatch.setattr(selector_induction, '_soup', lambda html: parses.append(1) or real_soup(html))
+    learner = SelectorLearner(relearn_after=3600)
+    html = '<html><body><p>Nothing that matches the record</p></body></html>'
+    record = {'product_name': 'Orbit 55 TV', 'price': '£499.00'}
+
+    assert learner.learn(URL, html, record) is None
+    assert learner.learn('https://tv.example/p/other', html, record) is None
+    assert len(parses) == 1
+    assert not learner.should_learn(URL)
+
+    learner.relearn_after = 0
+    assert learner.should_learn(URL)
@@ -0,0 +1,65 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from product_extractor import UniversalProductExtractor
+from service import create_server
+
+
+@pytest.fixture
+def service():
+    """(server, port) for a service backed by a real extractor"""
+    extractor = UniversalProductExtractor()
+    server = create_server(extractor, port=0, workers=1, max_queue=1, timeout=0.5)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, server.server_address[1]
+    server.shutdown()
+    server.server_close()
+    server.service.close()
+    extractor.close()
+
+
+def _raw(port, request):
+    """Send raw bytes and return the status line of the reply"""
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+        sock.sendall(request)
+        return sock.recv(4096).split(b'\r\n')[0].decode('latin-1')
+
+
+def _post(port, path, body, headers=b''):
+    data = json.dumps(body).encode('utf-8')
+    return _raw(port, b'POST ' + path.encode() + b' HTTP/1.1\r\nHost: test\r\n' + headers
+                + b'Content-Length: ' + str(len(data)).encode() + b'\r\n\r\n' + data)
+
+
+@pytest.mark.parametrize('header, status', [
+    (b'Content-Length: abc\r\n', '400'),
+    (b'Content-Length: -1\r\n', '400'),
+    (b'', '411'),
+])
+def test_malformed_content_length_is_rejected(service, header, status):
+    _, port = service
+    reply = _raw(port, b'POST /extract HTTP/1.1\r\nHost: test\r\n' + header + b'\r\n{}')
+    assert reply.split()[1] == status
+
+
+def test_malformed_request_line_gets_400(service):
+    _, port = service
+    assert '400' in _raw(port, b'GET /health HTTP/9x\r\n\r\n')
+
+
+def test_batch_rejects_non_http_urls(service):
+    _, port = service
+    assert _post(port, '/extract/batch', {"urls": ["https://shop.example/p/1", "notaurl"]}).split()[1] == '400'
+
+
+def test_slow_extraction_answers_504(service):
+    server, port = service
+    done = threading.Event()
+    server.service.extractor.extract_product_data = lambda url: done.wait(5)
+    try:
+        assert _post(port, '/extract', {"url": "https://shop.example/p/1"}).split()[1] == '504'
+    finally:
+        done.set()
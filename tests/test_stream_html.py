@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from html_cleaning import FEED_CHUNK_SIZE, stream_html
+from structured_data import extract_structured_data
+
+BODY = "<p>" + ("lorem ipsum dolor sit amet " * 800)[:20000] + "</p>"
+TRAILER = "<div>" + "q" * 400000 + "</div></body></html>"
+
+
+def _stream(page):
+    raw = page.encode('utf-8')
+    chunks = (raw[i:i + FEED_CHUNK_SIZE] for i in range(0, len(raw), FEED_CHUNK_SIZE))
+    html, _, bytes_read, stopped_early = stream_html(chunks, 'utf-8', 3 * 1024 * 1024, 4000)
+    assert stopped_early and bytes_read < len(raw)
+    return html
+
+
+JSON_LD = json.dumps({
+    "@context": "https://schema.org", "@type": "Product", "name": "Widget",
+    "description": "x" * 150000, "brand": {"@type": "Brand", "name": "Acme"},
+    "offers": {"@type": "Offer", "price": "49.99", "priceCurrency": "GBP",
+               "availability": "https://schema.org/InStock"},
+})
+MICRODATA = (
+    "<div itemscope itemtype='https://schema.org/Product'><span itemprop='name'>Widget</span>"
+    + "".join(f"<div><span>{'z' * 100}</span></div>" for _ in range(1500))
+    + "<div><span itemprop='price' content='49.99'>49.99</span></div>"
+    + "<link itemprop='availability' href='https://schema.org/InStock'></div>"
+)
+
+
+@pytest.mark.parametrize('markup', [
+    f"<script type='application/ld+json'>{JSON_LD}</script>",
+    MICRODATA,
+], ids=['json-ld', 'microdata'])
+def test_product_markup_across_chunks_is_read_in_full(markup):
+    page = f"<html><body>{BODY}{markup}{TRAILER}"
+    record = extract_structured_data(_stream(page))
+    assert record.get('product_name') == 'Widget'
+    assert '49.99' in (record.get('price') or '')
+    assert record.get('availability') == 'In Stock'
+
+
+def test_meta_charset_is_used_without_a_header_charset():
+    page = ('<html><head><meta charset="windows-1252"></head>'
+            '<body><h1>Café grinder</h1><p>Price £49.99</p></body></html>').encode('cp1252')
+    html, text, _, _ = stream_html([page], None, text_limit=4000)
+    assert 'Café grinder' in html
+    assert 'Price £49.99' in text
@@ -0,0 +1,36 @@
+from structured_data import extract_structured_data
+
+BREADCRUMBS = (
+    '<ol itemscope itemtype="https://schema.org/BreadcrumbList">'
+    '<li itemprop="itemListElement" itemscope itemtype="https://schema.org/ListItem">'
+    '<a itemprop="item" href="/"><span itemprop="name">Home</span></a></li></ol>'
+)
+
+
+def test_microdata_outside_the_product_scope_is_ignored():
+    page = (
+        '<html><head><meta property="og:title" content="Nimbus 900 Headphones"></head><body>'
+        + BREADCRUMBS
+        + '<p>No product microdata on this page</p></body></html>'
+    )
+    assert extract_structured_data(page)['product_name'] == 'Nimbus 900 Headphones'
+
+
+def test_nested_scopes_do_not_leak_into_the_product():
+    page = (
+        '<html><body>' + BREADCRUMBS
+        + '<div itemscope itemtype="https://schema.org/Product">'
+        '<div itemprop="offers" itemscope itemtype="https://schema.org/Offer">'
+        '<div itemprop="seller" itemscope itemtype="https://schema.org/Organization">'
+        '<span itemprop="name">BigShop</span></div>'
+        '<span itemprop="price" content="99.00">99</span><meta itemprop="priceCurrency" content="USD">'
+        '<link itemprop="availability" href="https://schema.org/InStock"></div>'
+        '<h1 itemprop="name">Nimbus 900</h1>'
+        '<div itemprop="brand" itemscope itemtype="https://schema.org/Brand"><span itemprop="name">Acme</span></div>'
+        '</div></body></html>'
+    )
+    data = extract_structured_data(page)
+    assert data['product_name'] == 'Nimbus 900'
+    assert data['brand'] == 'Acme'
+    assert data['price'] == '$99.00'
+    assert data['availability'] == 'In Stock'